@@ -5,71 +5,39 @@
 # ----------------------------------------------------------------------------------------------------------------------
 import urllib.request
 
-import os
-import numpy as np
-import pandas as pd
-
 from PIL import Image
 import streamlit as st
 from st_aggrid import AgGrid
 
 from sources.plot_function import plot_price_history_summary, plot_price_index_summary
-
-# ----------------------------------------------------------------------------------------------------------------------
-# Function Definition
-# ----------------------------------------------------------------------------------------------------------------------
-def load_data(filename="Decorceramica_twopieces.csv"):
-    """
-    Función que carga el archivo csv guardado al conectar con la base de datos y devuelve un dataframe
-    """
-    df = pd.read_csv(filename)
-
-    return df
-
+from sources.figure_cache import data_version, figure_cache
+from sources.data_loader import DATA_DIRECTORY, MASTER_FILE, load_master, load_source
+from sources.data_filters import compare_products, filter_history
+from sources.price_index import overall_price_index, price_index_table
+from sources.chart_encoding import format_report
+from sources.tools import export_table, show_figure
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Configuration and Global Variables
 # ----------------------------------------------------------------------------------------------------------------------
-# Loading the files
-# Folder path definition
-directory = './data'
-
-files_list = []
-for path, _, files in os.walk(directory):
-    for name in files:
-        files_list.append(os.path.join(path, name))
-
-# Empty data frame
-df = pd.DataFrame()
-
-# Loading the DF of each month in a unique DF
-for file in files_list:
-    df = pd.concat([df, load_data(filename=file)])
-
-# Dropping duplicates in case the robot take two values by day
-df.drop_duplicates(inplace=True)
-
-# Creating a new product name combining the product name + sku
-df['Producto_sku'] = ['_'.join(i) for i in zip(df['Producto'], df['SKU'].map(str))]
-
-# String the SKU
-df['SKU_str'] = df['SKU'].map(str)
+# Loading the files, or the embedded database if configured
+source, version = load_source(DATA_DIRECTORY)
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Loading the Master Database
-# Reading files with the directory for comparisons
-comp_df = pd.read_excel('sources/Productos Mansfield.xlsx')
+comp_df = load_master(MASTER_FILE)
 
-# Organizing the SKU
-comp_df['Homologo'] = comp_df['Homologo Mansfield'].map(str)
-comp_df['Homologo'] = comp_df['Homologo'].apply(lambda x: x.strip())
+# The charts also depend on the homologues of the master database, its version is part of the figure cache key
+version = f"{version}-{data_version([MASTER_FILE])}"
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Mansfield df Summary products
 sku_list_mansfield = ['130010007', '135010007', '137210040', '160010007', '384010000', '386010000']
 
-Mansfield_df = df[df["Fabricante"] == 'Mansfield']
-Mansfield_df = Mansfield_df[Mansfield_df['SKU_str'].isin(sku_list_mansfield)]
+Mansfield_df = filter_history(source, brand='Mansfield', skus=sku_list_mansfield)
+
+# Summary products and their competitors
+df_summary = filter_history(source, skus=comp_df[comp_df['Homologo'].isin(sku_list_mansfield)]['Sku'])
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Streamlit Setting
@@ -84,10 +52,11 @@ st.title('General Summary - Price Monitoring')
 # ----------------------------------------------------------------------------------------------------------------------
 st.header('Mansfield Price Index Summary')
 
-# # Plot price index summary
-fig = plot_price_index_summary(df=df, comp_df=comp_df, sku_list_mansfield= sku_list_mansfield,
-                               title=f"Mansfield Price Index", orient_h=True)
-st.plotly_chart(fig, use_container_width=True)
+# # Plot price index summary (df_summary only depends on sku_list_mansfield and the master database)
+fig, payload = figure_cache.get_or_build(plot_price_index_summary, version, params=tuple(sku_list_mansfield),
+                                         df=df_summary, comp_df=comp_df, sku_list_mansfield=sku_list_mansfield,
+                                         title=f"Mansfield Price Index", orient_h=True)
+chart_payload = {'Price index summary': show_figure(fig, payload)}
 
 
 st.subheader('Price Analysis Detailed')
@@ -111,34 +80,30 @@ c1.image(image, caption='{} ({}) ${:,} {}'.format(mansfield_product["Producto"].
 c1.markdown("**The url of the product is:** {}".format(mansfield_product["URL"].iloc[-1]))
 
 # Products to visualize
-sku_comp = comp_df[comp_df['Homologo'] == str(sku_mansfield)]['Sku']
-
-# Filter df
-df_comp = df[df['SKU_str'].isin(list(sku_comp))]
+df_comp = compare_products(source, comp_df, sku_mansfield)
 
-# Plot price history
-fig = plot_price_history_summary(df=df_comp, group="Producto_sku",
-                                 title=f"Mansfield Price index for {mansfield_product_sel}",
-                                 orient_h=True)
+# Plot price history (df_comp only depends on the product selected and the master database)
+fig, payload = figure_cache.get_or_build(plot_price_history_summary, version, params=(mansfield_product_sel,),
+                                         df=df_comp, group="Producto_sku",
+                                         title=f"Mansfield Price index for {mansfield_product_sel}",
+                                         orient_h=True)
 
 fig.update_layout(height=420)
-c2.plotly_chart(fig, use_container_width=True)
+chart_payload['Price history'] = show_figure(fig, payload, c2)
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Price index summary and data explorer
 st.markdown("""---""")
 
 # Price index
-df_info_price = df_comp[df_comp['Fecha'] == df_comp['Fecha'].iloc[-1]].copy()
-mansfield_ref = df_info_price[df_info_price['Producto'] == mansfield_product_sel]['Precio'].values
-df_info_price['Price_index'] = np.round(((mansfield_ref / df_info_price['Precio']) * 100), 2)
+df_info_price = price_index_table(df_comp, mansfield_product_sel, price_col='Precio')
 
 # Calculating overall price index
-overall_price_index = np.round((df_info_price['Price_index'].abs().sum() - 100) / (len(df_info_price) - 1), 2)
+overall_index = overall_price_index(df_info_price)
 
 cc1, cc2 = st.columns((1, 8))
 with cc1:
-    st.metric(label="Overall Price Index", value=f"{overall_price_index}%")
+    st.metric(label="Overall Price Index", value=f"{overall_index}%")
 
 with cc2:
     AgGrid(df_info_price[['Fecha', 'Market_Place', 'Linea', 'Producto', 'Precio', 'Price_index', 'URL']],
@@ -146,3 +111,16 @@ with cc2:
            fit_columns_on_grid_load=False, theme="streamlit",  # "light", "dark", "blue", "material"
            key="price_index", reload_data=True,  # gridOptions=gridoptions,
            enable_enterprise_modules=False)
+
+# Export of the price index table
+export_table(df_info_price[['Fecha', 'Market_Place', 'Linea', 'Producto', 'Precio', 'Price_index', 'URL']],
+             key="price_index", file_name=f"price_index_{sku_mansfield}")
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Figure cache counters and chart payload
+cache_stats = figure_cache.stats()
+st.sidebar.caption("Figure cache: {hits} hits | {misses} misses | {size}/{maxsize} figures".format(**cache_stats))
+
+# Size of the charts sent to the browser
+for chart_name, report in chart_payload.items():
+    st.sidebar.caption(f"{chart_name} payload: {format_report(report)}")
@@ -0,0 +1,150 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Batch report of the price index for every Mansfield product, without a browser session.
+# Usage (from the 01_App folder):
+#   python batch_report.py --output reports --workers 8 --figure-format json
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from sources.data_filters import compare_products
+from sources.data_loader import DATA_DIRECTORY, MASTER_FILE, list_data_files, load_history, load_master
+from sources.plot_function import plot_price_history_index
+from sources.price_index import overall_price_index, price_index_table
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Configuration and Global Variables
+# ----------------------------------------------------------------------------------------------------------------------
+# Columns of the consolidated index table
+INDEX_COLUMNS = ['Homologo', 'Producto_Mansfield', 'Fecha', 'Fabricante', 'Market_Place', 'Linea', 'Producto',
+                 'SKU', 'Precio', 'Price_index', 'URL']
+
+# Data of each worker, loaded once by the pool initializer
+_df = None
+_comp_df = None
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Function Definition
+# ----------------------------------------------------------------------------------------------------------------------
+def init_worker(df, comp_df):
+    """
+    Función que guarda en cada proceso el historico y la base maestra para no enviarlos en cada tarea.
+    """
+    global _df, _comp_df
+    _df = df
+    _comp_df = comp_df
+
+
+def product_report(sku_mansfield, figures_dir, figure_format):
+    """
+    Función que calcula el índice de precio de un producto Mansfield y guarda su gráfica.
+    :param sku_mansfield: SKU del producto Mansfield (Homologo).
+    :param figures_dir: Carpeta donde se guardan las gráficas.
+    :param figure_format: 'json' o 'html'.
+    :return: (sku_mansfield, df_info_price, error): df_info_price es None si el producto no se pudo calcular.
+    """
+    try:
+        df_comp = compare_products(_df, _comp_df, sku_mansfield).copy()
+        df_comp['Precio_factor'] = df_comp['Precio']
+
+        mansfield_prod = df_comp[df_comp['SKU_str'] == sku_mansfield]['Producto'].iloc[-1]
+
+        # Price index
+        df_info_price = price_index_table(df_comp, mansfield_prod, price_col='Precio')
+        df_info_price['Homologo'] = sku_mansfield
+        df_info_price['Producto_Mansfield'] = mansfield_prod
+
+        # Plot price index, some Homologos contains '/' (e.g. 148/123)
+        figure_name = sku_mansfield.replace('/', '-')
+        fig = plot_price_history_index(df=df_comp, group="Producto_sku", mansfield_prod=mansfield_prod,
+                                       title=f"Mansfield Price index for {mansfield_prod}", orient_h=True)
+        if figure_format == 'html':
+            fig.write_html(os.path.join(figures_dir, f"{figure_name}.html"), include_plotlyjs='cdn')
+        else:
+            with open(os.path.join(figures_dir, f"{figure_name}.json"), 'w') as file:
+                file.write(fig.to_json())
+
+        return sku_mansfield, df_info_price[INDEX_COLUMNS], None
+
+    except Exception as e:
+        return sku_mansfield, None, repr(e)
+
+
+def run_batch(output, data_directory=DATA_DIRECTORY, master_file=MASTER_FILE, workers=None, figure_format='json'):
+    """
+    Función que genera el reporte de índices de precio para todos los Homologos de la base maestra.
+    :param output: Carpeta de salida del reporte.
+    :param data_directory: Carpeta con los archivos csv del robot.
+    :param master_file: Archivo excel con la base maestra.
+    :param workers: Número de procesos, por defecto todos los núcleos.
+    :param figure_format: 'json' o 'html' para las gráficas de cada producto.
+    :return: df_report: data frame consolidado con el índice de precio de cada producto.
+    """
+    figures_dir = os.path.join(output, 'figures')
+    os.makedirs(figures_dir, exist_ok=True)
+
+    # Loading the data once in the main process
+    df = load_history(list_data_files(data_directory))
+    comp_df = load_master(master_file)
+
+    # Only the products of the master database are sent to the workers
+    df = df[df['SKU_str'].isin(list(comp_df['Sku'].map(str)))]
+
+    # Mansfield products with data
+    sku_with_data = set(df.loc[df['Fabricante'] == 'Mansfield', 'SKU_str'])
+    sku_list_mansfield = [sku for sku in comp_df['Homologo'].unique() if sku in sku_with_data]
+
+    reports = []
+    summary = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(df, comp_df)) as executor:
+        futures = [executor.submit(product_report, sku, figures_dir, figure_format) for sku in sku_list_mansfield]
+        for future in futures:
+            sku_mansfield, df_info_price, error = future.result()
+            if error is not None:
+                print(f"SKU {sku_mansfield} skipped: {error}")
+                summary.append({'Homologo': sku_mansfield, 'Overall_price_index': None, 'Error': error})
+                continue
+
+            # Overall index only when there are competitors in the last date
+            overall_index = overall_price_index(df_info_price) if len(df_info_price) > 1 else None
+
+            reports.append(df_info_price)
+            summary.append({'Homologo': sku_mansfield,
+                            'Producto_Mansfield': df_info_price['Producto_Mansfield'].iloc[0],
+                            'Fecha': df_info_price['Fecha'].iloc[0],
+                            'Overall_price_index': overall_index,
+                            'Error': None})
+
+    # Consolidated tables
+    df_report = pd.concat(reports) if reports else pd.DataFrame(columns=INDEX_COLUMNS)
+    df_report.to_csv(os.path.join(output, 'price_index.csv'), index=False)
+    pd.DataFrame(summary).to_csv(os.path.join(output, 'overall_price_index.csv'), index=False)
+
+    return df_report
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Main
+# ----------------------------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Price index report for every Mansfield product.")
+    parser.add_argument('--output', default='reports', help="Output folder of the report.")
+    parser.add_argument('--data-dir', default=DATA_DIRECTORY, help="Folder with the csv files of the robot.")
+    parser.add_argument('--master', default=MASTER_FILE, help="Excel file with the master database.")
+    parser.add_argument('--workers', type=int, default=None, help="Number of processes, all the cores by default.")
+    parser.add_argument('--figure-format', choices=['json', 'html'], default='json',
+                        help="Format of the figure saved for each product.")
+    args = parser.parse_args()
+
+    start = time.time()
+    df_report = run_batch(args.output, data_directory=args.data_dir, master_file=args.master, workers=args.workers,
+                          figure_format=args.figure_format)
+    print(f"{df_report['Homologo'].nunique()} products reported in {time.time() - start:.1f} s -> {args.output}")
@@ -0,0 +1,35 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Builds the embedded database (DuckDB or SQLite) with the price history and the master database.
+# Usage (from the 01_App folder):
+#   python build_database.py --output data_db/pricing.duckdb
+#   PRICING_DATABASE=data_db/pricing.duckdb streamlit run Home_Dashboard_Pricing.py
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import os
+import time
+import argparse
+
+from sources.data_loader import DATA_DIRECTORY, MASTER_FILE, list_data_files, load_history, load_master
+from sources.sql_backend import build_database
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Main
+# ----------------------------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Embedded database with the price history.")
+    parser.add_argument('--output', default='data_db/pricing.duckdb',
+                        help="Path of the database, use the .sqlite extension for SQLite.")
+    parser.add_argument('--data-dir', default=DATA_DIRECTORY, help="Folder with the csv files of the robot.")
+    parser.add_argument('--master', default=MASTER_FILE, help="Excel file with the master database.")
+    args = parser.parse_args()
+
+    start = time.time()
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+
+    df = load_history(list_data_files(args.data_dir))
+    build_database(df, load_master(args.master), args.output)
+    print(f"{len(df)} rows written in {time.time() - start:.1f} s -> {args.output}")
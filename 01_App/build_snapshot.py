@@ -0,0 +1,43 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Builds a versioned, memory-mapped snapshot of the price history shared by several dashboard processes.
+# Usage (from the 01_App folder):
+#   python build_snapshot.py --output snapshots
+#   PRICING_SNAPSHOT=snapshots streamlit run Home_Dashboard_Pricing.py
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import os
+import time
+import argparse
+
+from sources.data_loader import DATA_DIRECTORY, MASTER_FILE, list_data_files, load_history, load_master
+from sources.figure_cache import data_version
+from sources.snapshot import CURRENT_FILE, write_snapshot
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Main
+# ----------------------------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Memory-mapped snapshot of the price history.")
+    parser.add_argument('--output', default='snapshots', help="Folder of the snapshots.")
+    parser.add_argument('--data-dir', default=DATA_DIRECTORY, help="Folder with the csv files of the robot.")
+    parser.add_argument('--master', default=MASTER_FILE, help="Excel file with the master database.")
+    parser.add_argument('--keep', type=int, default=2, help="Number of versions kept in the folder.")
+    args = parser.parse_args()
+
+    start = time.time()
+    os.makedirs(args.output, exist_ok=True)
+
+    files_list = list_data_files(args.data_dir)
+    version = data_version(files_list + [args.master])
+
+    # Nothing to do when the current version is already published
+    current = os.path.join(args.output, CURRENT_FILE)
+    if os.path.exists(current) and open(current).read().strip() == version:
+        print(f"Snapshot {version} is already the current version")
+    else:
+        df = load_history(files_list)
+        path = write_snapshot(df, load_master(args.master), args.output, version, keep=args.keep)
+        print(f"{len(df)} rows written in {time.time() - start:.1f} s -> {path}")
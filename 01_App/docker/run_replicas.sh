@@ -0,0 +1,72 @@
+#!/bin/sh
+# ----------------------------------------------------------------------------------------------------------------------
+# Multi-replica deployment on one host: builds the memory-mapped snapshot of the data, starts REPLICAS streamlit
+# workers that map the same snapshot read-only and puts nginx in front of them as local load balancer.
+#   REPLICAS      Number of streamlit workers (default: number of cores)
+#   PORT          Port exposed by nginx (default 8501)
+#   SNAPSHOT_DIR  Folder of the snapshots (default /app/snapshots)
+#   REFRESH       Seconds between snapshot rebuilds, 0 to disable (default 3600)
+# ----------------------------------------------------------------------------------------------------------------------
+set -e
+cd /app
+
+REPLICAS=${REPLICAS:-$(nproc)}
+PORT=${PORT:-8501}
+SNAPSHOT_DIR=${SNAPSHOT_DIR:-/app/snapshots}
+REFRESH=${REFRESH:-3600}
+export PRICING_SNAPSHOT=$SNAPSHOT_DIR
+
+# Builder: first version before starting the workers, then a new version only when the data changes
+python build_snapshot.py --output "$SNAPSHOT_DIR"
+if [ "$REFRESH" -gt 0 ]; then
+    (while sleep "$REFRESH"; do python build_snapshot.py --output "$SNAPSHOT_DIR"; done) &
+fi
+
+# Workers
+UPSTREAM=""
+i=0
+while [ "$i" -lt "$REPLICAS" ]; do
+    WORKER_PORT=$((8601 + i))
+    streamlit run Home_Dashboard_Pricing.py --server.port "$WORKER_PORT" --server.address 127.0.0.1 \
+        --server.headless true &
+    UPSTREAM="$UPSTREAM        server 127.0.0.1:$WORKER_PORT;\n"
+    i=$((i + 1))
+done
+
+# Load balancer, every request of a browser must stay on the same worker (websocket and the /media files kept in the
+# memory of the worker). The browser is pinned with a route cookie set on its first response, so the users behind the
+# same NAT (a sales office) are still spread over the workers.
+# Host keeps the port of the browser (\$http_host), the websocket of streamlit compares it with the Origin.
+cat > /etc/nginx/conf.d/streamlit.conf <<CONF
+map \$http_upgrade \$connection_upgrade {
+        default upgrade;
+        ""      close;
+}
+
+map \$cookie_route \$route {
+        ""      \$request_id;
+        default \$cookie_route;
+}
+
+upstream streamlit {
+        hash \$route consistent;
+$(printf "$UPSTREAM")
+}
+
+server {
+        listen $PORT;
+
+        location / {
+                add_header Set-Cookie "route=\$route; Path=/; HttpOnly; SameSite=Lax" always;
+                proxy_pass http://streamlit;
+                proxy_http_version 1.1;
+                proxy_set_header Upgrade \$http_upgrade;
+                proxy_set_header Connection \$connection_upgrade;
+                proxy_set_header Host \$http_host;
+                proxy_read_timeout 86400;
+        }
+}
+CONF
+rm -f /etc/nginx/sites-enabled/default
+
+exec nginx -g 'daemon off;'
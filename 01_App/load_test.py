@@ -0,0 +1,348 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Load test of the dashboard: several simulated sessions run the real scripts (Home_Dashboard_Pricing.py,
+# pages/01_Price_Index.py) concurrently, one thread per session as the streamlit server does, replaying interaction
+# scripts (filter changes, product selection, multiplier edits). The image URLs are served by a local HTTP stand-in.
+# Usage (from the 01_App folder):
+#   python load_test.py --sessions 8 --duration 60 --image-latency 0.2 --output load_test.json
+#
+# The streamlit and st_aggrid modules are replaced in this process by a headless version that returns the widget
+# values of the interaction script and serializes the charts and grids as the server does, so the latency measured is
+# the one of the script reruns, without the browser and the websocket.
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import os
+import sys
+import json
+import time
+import types
+import random
+import resource
+import argparse
+import threading
+import traceback
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Configuration and Global Variables
+# ----------------------------------------------------------------------------------------------------------------------
+HOME_SCRIPT = 'Home_Dashboard_Pricing.py'
+PRICE_INDEX_SCRIPT = 'pages/01_Price_Index.py'
+
+# Interaction scripts: list of reruns (script, widget values). The widgets are identified by key or label, the value
+# can be {'index': i} to pick the i-th option of a selectbox/radio.
+SCENARIOS = {
+    'landing': [
+        (HOME_SCRIPT, {}),
+        (HOME_SCRIPT, {'Which Mansfield product wants to compare?': {'index': 1}}),
+        (HOME_SCRIPT, {'Which Mansfield product wants to compare?': {'index': 2}}),
+    ],
+    'filters': [
+        (PRICE_INDEX_SCRIPT, {}),
+        (PRICE_INDEX_SCRIPT, {'Select one option': 'Brand', 'Which brands wants to visualize?': {'index': 1}}),
+        (PRICE_INDEX_SCRIPT, {'Select one option': 'Brand', 'Which brands wants to visualize?': {'index': 1},
+                              'Which format wants to visualize?': {'index': 1}}),
+        (PRICE_INDEX_SCRIPT, {'Select one option': 'SKU', 'Which SKU wants to visualize?': '135010007'}),
+        (PRICE_INDEX_SCRIPT, {'Select one option': 'Price Range', 'Select a range of prices': (150.0, 300.0)}),
+    ],
+    'product': [
+        (PRICE_INDEX_SCRIPT, {'Which Mansfield product wants to compare?': {'index': 0}}),
+        (PRICE_INDEX_SCRIPT, {'Which Mansfield product wants to compare?': {'index': 3}}),
+        (PRICE_INDEX_SCRIPT, {'Which format wants to compare?': {'index': 1},
+                              'Which Mansfield product wants to compare?': {'index': 1}}),
+    ],
+    'multiplier': [
+        (PRICE_INDEX_SCRIPT, {'Insert the Multiplier Factor (%)': 0}),
+        (PRICE_INDEX_SCRIPT, {'Insert the Multiplier Factor (%)': 5}),
+        (PRICE_INDEX_SCRIPT, {'Insert the Multiplier Factor (%)': -10}),
+    ],
+}
+
+# Session of the current thread
+_local = threading.local()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Function Definition
+# ----------------------------------------------------------------------------------------------------------------------
+class HeadlessSession:
+    """
+    State of a simulated browser session: widget values of the current rerun, session_state and payload counters.
+    """
+    def __init__(self):
+        self.values = {}
+        self.session_state = {}
+        self.payload_bytes = 0
+
+    def widget(self, label, key, default, options=None):
+        value = self.values.get(key, self.values.get(label, default)) if key is not None else \
+            self.values.get(label, default)
+        if isinstance(value, dict) and 'index' in value:
+            value = options[value['index'] % len(options)] if len(options) else None
+        if key is not None:
+            self.session_state[key] = value
+        return value
+
+
+class HeadlessContainer:
+    """
+    Headless version of the streamlit elements used by the scripts (st, columns, expanders, sidebar).
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def __getattr__(self, name):
+        # Module attributes (__path__, __spec__, ...) do not exist, the import system checks them
+        if name.startswith('__') and name.endswith('__'):
+            raise AttributeError(name)
+        # Text elements and the rest of calls without return value
+        return lambda *args, **kwargs: None
+
+    # Layout
+    def columns(self, spec, **kwargs):
+        return [HeadlessContainer() for _ in range(spec if isinstance(spec, int) else len(spec))]
+
+    def expander(self, *args, **kwargs):
+        return HeadlessContainer()
+
+    def container(self, *args, **kwargs):
+        return HeadlessContainer()
+
+    # Widgets
+    def radio(self, label, options, index=0, key=None, **kwargs):
+        options = list(options)
+        return _local.session.widget(label, key, options[index] if options else None, options)
+
+    def selectbox(self, label, options, index=0, key=None, **kwargs):
+        options = list(options)
+        return _local.session.widget(label, key, options[index] if options else None, options)
+
+    def text_input(self, label, value='', key=None, **kwargs):
+        return _local.session.widget(label, key, value)
+
+    def number_input(self, label, min_value=None, max_value=None, value=0, key=None, **kwargs):
+        return _local.session.widget(label, key, value)
+
+    def slider(self, label, min_value=None, max_value=None, value=None, key=None, **kwargs):
+        return _local.session.widget(label, key, value)
+
+    def button(self, label, key=None, **kwargs):
+        return _local.session.widget(label, key, False)
+
+    # Elements sent to the browser
+    def plotly_chart(self, figure_or_data, **kwargs):
+        _local.session.payload_bytes += len(figure_or_data.to_json())
+
+    def image(self, image, **kwargs):
+        _local.session.payload_bytes += len(image.tobytes())
+
+    def download_button(self, label, data, **kwargs):
+        _local.session.payload_bytes += len(data)
+
+
+def headless_html(html, *args, **kwargs):
+    """
+    Replacement of streamlit.components.v1.html (binary charts), the component sends the html text.
+    """
+    _local.session.payload_bytes += len(html)
+
+
+# streamlit.components.v1
+HEADLESS_COMPONENTS = types.SimpleNamespace(v1=types.SimpleNamespace(html=headless_html))
+
+
+class HeadlessStreamlit(HeadlessContainer):
+    """
+    Replacement of the streamlit module, the session_state is the one of the session of the thread.
+    """
+    sidebar = HeadlessContainer()
+    components = HEADLESS_COMPONENTS
+
+    @property
+    def session_state(self):
+        return _local.session.session_state
+
+
+def headless_aggrid(data, *args, **kwargs):
+    """
+    Replacement of st_aggrid.AgGrid, the grid sends the data frame as json.
+    """
+    _local.session.payload_bytes += len(data.to_json(orient='records'))
+
+
+def install_headless_modules():
+    """
+    Función que reemplaza los módulos streamlit y st_aggrid por las versiones headless.
+    """
+    sys.modules['streamlit'] = HeadlessStreamlit()
+    sys.modules['streamlit.components'] = HEADLESS_COMPONENTS
+    sys.modules['streamlit.components.v1'] = HEADLESS_COMPONENTS.v1
+    sys.modules['st_aggrid'] = types.SimpleNamespace(AgGrid=headless_aggrid)
+
+
+def start_image_server(image_file='images/Empty.png', latency=0.0):
+    """
+    Función que inicia el servidor HTTP local que reemplaza las URL de las imágenes y redirige urlretrieve a él.
+    :param image_file: Imagen que responde el servidor.
+    :param latency: Segundos de espera por cada imagen, para simular los sitios de los marketplaces.
+    :return: server: Servidor HTTP (se detiene con shutdown()).
+    """
+    with open(image_file, 'rb') as file:
+        image = file.read()
+
+    class ImageHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/png')
+            self.send_header('Content-Length', str(len(image)))
+            self.end_headers()
+            self.wfile.write(image)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ImageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Every image request of the scripts goes to the local server
+    urlretrieve = urllib.request.urlretrieve
+
+    def local_urlretrieve(url, filename=None, *args, **kwargs):
+        local_url = f"http://127.0.0.1:{server.server_port}/image?src={urllib.parse.quote(str(url))}"
+        return urlretrieve(local_url, filename, *args, **kwargs)
+
+    urllib.request.urlretrieve = local_urlretrieve
+
+    return server
+
+
+def run_session(scenario, deadline, think_time, results, max_reruns=None):
+    """
+    Función que simula una sesión: repite el guion de interacción hasta la hora límite midiendo cada rerun.
+    :param scenario: Nombre del guion en SCENARIOS.
+    :param deadline: Hora (time.monotonic) de fin de la prueba.
+    :param think_time: Segundos de espera entre reruns.
+    :param results: Lista donde se agregan los resultados de cada rerun.
+    :param max_reruns: Número máximo de reruns, sin límite por defecto.
+    """
+    _local.session = session = HeadlessSession()
+    steps = SCENARIOS[scenario]
+    step = 0
+    while time.monotonic() < deadline and (max_reruns is None or step < max_reruns):
+        script, values = steps[step % len(steps)]
+        session.values = values
+        session.payload_bytes = 0
+
+        start = time.perf_counter()
+        error = None
+        try:
+            with open(script) as file:
+                code = compile(file.read(), script, 'exec')
+            exec(code, {'__name__': '__main__', '__file__': script})
+        except Exception:
+            error = traceback.format_exc(limit=-1).strip().splitlines()[-1]
+        latency = time.perf_counter() - start
+
+        results.append({'scenario': scenario, 'script': script, 'latency': latency,
+                        'payload_bytes': session.payload_bytes, 'error': error})
+        step += 1
+        time.sleep(think_time)
+
+
+def summarize(results, elapsed):
+    """
+    Función que calcula los percentiles de latencia, el throughput y la memoria máxima.
+    """
+    def latency_stats(rows):
+        latency = np.array([row['latency'] for row in rows]) * 1000
+        return {'reruns': len(rows), 'errors': sum(row['error'] is not None for row in rows),
+                'p50_ms': round(float(np.percentile(latency, 50)), 1),
+                'p95_ms': round(float(np.percentile(latency, 95)), 1),
+                'p99_ms': round(float(np.percentile(latency, 99)), 1),
+                'mean_payload_kb': round(float(np.mean([row['payload_bytes'] for row in rows])) / 1024, 1)}
+
+    summary = {'elapsed_s': round(elapsed, 1), 'throughput_rps': round(len(results) / elapsed, 2),
+               # ru_maxrss is in kilobytes on Linux
+               'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+               'total': latency_stats(results), 'scripts': {}, 'errors': {}}
+    for script in sorted({row['script'] for row in results}):
+        summary['scripts'][script] = latency_stats([row for row in results if row['script'] == script])
+    for row in results:
+        if row['error'] is not None:
+            summary['errors'][row['error']] = summary['errors'].get(row['error'], 0) + 1
+
+    return summary
+
+
+def run_load_test(sessions=8, duration=60.0, scenarios=None, think_time=0.0, image_latency=0.0, seed=0):
+    """
+    Función que ejecuta la prueba de carga con varias sesiones concurrentes.
+    :param sessions: Número de sesiones simultáneas.
+    :param duration: Duración de la prueba en segundos.
+    :param scenarios: Lista de guiones a repartir entre las sesiones, por defecto todos.
+    :param think_time: Segundos de espera entre reruns de cada sesión.
+    :param image_latency: Segundos de respuesta del servidor local de imágenes.
+    :param seed: Semilla para repartir los guiones.
+    :return: summary: Diccionario con los resultados.
+    """
+    install_headless_modules()
+    server = start_image_server(latency=image_latency)
+    sys.path.insert(0, os.getcwd())
+
+    # Warm up: imports and first load outside the measure
+    warm_up = []
+    for scenario in SCENARIOS:
+        run_session(scenario, float('inf'), 0.0, warm_up, max_reruns=1)
+
+    scenarios = scenarios or list(SCENARIOS)
+    rng = random.Random(seed)
+    results = []
+    deadline = time.monotonic() + duration
+    threads = [threading.Thread(target=run_session, args=(rng.choice(scenarios), deadline, think_time, results))
+               for _ in range(sessions)]
+
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    server.shutdown()
+
+    summary = summarize(results, elapsed)
+    summary['sessions'] = sessions
+    summary['warm_up_errors'] = [row['error'] for row in warm_up if row['error'] is not None]
+
+    return summary
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Main
+# ----------------------------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Concurrent sessions load test of the dashboard.")
+    parser.add_argument('--sessions', type=int, default=8, help="Number of simultaneous sessions.")
+    parser.add_argument('--duration', type=float, default=60.0, help="Duration of the test in seconds.")
+    parser.add_argument('--scenarios', nargs='*', choices=list(SCENARIOS), default=None,
+                        help="Interaction scripts used by the sessions, all by default.")
+    parser.add_argument('--think-time', type=float, default=0.0, help="Seconds between reruns of a session.")
+    parser.add_argument('--image-latency', type=float, default=0.0,
+                        help="Seconds the local image server takes to answer.")
+    parser.add_argument('--output', default=None, help="Json file with the results.")
+    args = parser.parse_args()
+
+    summary = run_load_test(args.sessions, args.duration, args.scenarios, args.think_time, args.image_latency)
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(summary, file, indent=2)
@@ -3,63 +3,28 @@
 # ----------------------------------------------------------------------------------------------------------------------
 # Libraries import
 # ----------------------------------------------------------------------------------------------------------------------
-import os
-
-import numpy as np
-import pandas as pd
 import streamlit as st
+from sources.data_filters import compare_products, distinct_values, filter_history, filter_price_range, min_price
+from sources.data_loader import DATA_DIRECTORY, MASTER_FILE, load_master, load_source
+from sources.figure_cache import data_version, figure_cache
 from sources.plot_function import plot_price_history, plot_price_history_index
-from sources.tools import url_image_capture, visual_info_multiplier
+from sources.price_index import overall_price_index, price_index_table
+from sources.chart_encoding import format_report
+from sources.tools import export_table, multiplier_vector, show_figure, url_image_capture, visual_info_multiplier
 from st_aggrid import AgGrid
 
-# ----------------------------------------------------------------------------------------------------------------------
-# Function Definition
-# ----------------------------------------------------------------------------------------------------------------------
-def load_data(filename="Decorceramica_twopieces.csv"):
-    """
-    Función que carga el archivo csv guardado al conectar con la base de datos y devuelve un dataframe
-    """
-    df = pd.read_csv(filename)
-
-    return df
-
-
 # ----------------------------------------------------------------------------------------------------------------------
 # Configuration and Global Variables
 # ----------------------------------------------------------------------------------------------------------------------
-# Loading the files
-# Folder path definition
-directory = './data'
-
-files_list = []
-for path, _, files in os.walk(directory):
-    for name in files:
-        files_list.append(os.path.join(path, name))
-
-# Empty data frame
-df = pd.DataFrame()
-
-# Loading the DF of each month in a unique DF
-for file in files_list:
-    df = pd.concat([df, load_data(filename=file)])
-
-# Dropping duplicates in case the robot take two values by day
-df.drop_duplicates(inplace=True)
-
-# Creating a new product name combining the product name + sku
-df['Producto_sku'] = ['_'.join(i) for i in zip(df['Producto'], df['SKU'].map(str))]
-
-# String the SKU
-df['SKU_str'] = df['SKU'].map(str)
+# Loading the files, or the embedded database if configured
+source, version = load_source(DATA_DIRECTORY)
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Loading the Master Database
-# Reading files with the directory for comparisons
-comp_df = pd.read_excel('sources/Productos Mansfield.xlsx')
+comp_df = load_master(MASTER_FILE)
 
-# Organizing the SKU
-comp_df['Homologo'] = comp_df['Homologo Mansfield'].map(str)
-comp_df['Homologo'] = comp_df['Homologo'].apply(lambda x: x.strip())
+# The charts also depend on the homologues of the master database, its version is part of the figure cache key
+version = f"{version}-{data_version([MASTER_FILE])}"
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Streamlit Setting
@@ -87,7 +52,7 @@ if filt1 == 'SKU':
         # Convert to number if possible
         if sku_filter.isdigit():
             sku_filter = int(sku_filter)
-        df_filter = df[df["SKU"] == sku_filter]  # 4021.101N.020, N2420, 135010007
+        df_filter = filter_history(source, sku=sku_filter)  # 4021.101N.020, N2420, 135010007
 
     if len(df_filter) == 0:
         st.error(f"SKU {sku_filter} not found in dataset")
@@ -97,41 +62,51 @@ else:
     with col2:
         # Filtering by marketplace
         if filt1 == 'Marketplace':
-            market_brand_sel = st.selectbox("Which marketplace wants to visualize?", df["Market_Place"].unique(), 0)
-            df_filter = df[df["Market_Place"] == market_brand_sel]
+            market_brand_sel = st.selectbox("Which marketplace wants to visualize?",
+                                            distinct_values(source, "Market_Place"), 0)
+            df_filter = filter_history(source, market_place=market_brand_sel)
 
         # Filtering by brand
         elif filt1 == 'Brand':
-            market_brand_sel = st.selectbox("Which brands wants to visualize?", df["Fabricante"].unique(), 0)
-            df_filter = df[df["Fabricante"] == market_brand_sel]
+            market_brand_sel = st.selectbox("Which brands wants to visualize?",
+                                            distinct_values(source, "Fabricante"), 0)
+            df_filter = filter_history(source, brand=market_brand_sel)
 
         # Range price
         elif filt1 == 'Price Range':
-            price_range = st.slider('Select a range of prices', df['Precio'].min(), 1000.0,
+            price_range = st.slider('Select a range of prices', float(min_price(source)), 1000.0,
                                     (100.0, 200.0), step=1.0)
 
             # Filtering the price by the last data
-            df_filter_aux = df[(df["Precio"] >= price_range[0]) & (df["Precio"] <= price_range[1]) &
-                               (df["Fecha"] == df.iloc[-1]['Fecha'])]
-
-            df_filter = df[df['Producto_sku'].isin(list(df_filter_aux['Producto_sku'].unique()))]
+            df_filter = filter_price_range(source, price_range[0], price_range[1])
 
     with col3:
         # filtering by format
-        market_brand_sel = st.selectbox("Which format wants to visualize?", ['All'] +
-                                        list(df_filter["Tipo"].unique()))
-        if market_brand_sel == 'All':
+        format_sel = st.selectbox("Which format wants to visualize?", ['All'] +
+                                  list(df_filter["Tipo"].unique()))
+        if format_sel == 'All':
             pass
         else:
-            df_filter = df_filter[df_filter["Tipo"] == market_brand_sel]
+            df_filter = df_filter[df_filter["Tipo"] == format_sel]
 
 # ------------------------------------------------------------------------------------------------------------------
 # Plotting line plot
+chart_payload = {}
 if len(df_filter) == 0:
     pass
 else:
-    fig = plot_price_history(df=df_filter, group="Producto_sku", title="Price over Time")
-    st.plotly_chart(fig, use_container_width=True)
+    # Parameters of the filter applied, key of the figure cache: they must define df_filter completely (every filter
+    # added above has to be added here)
+    if filt1 == 'SKU':
+        filter_params = (filt1, sku_filter)
+    elif filt1 == 'Price Range':
+        filter_params = (filt1, price_range, format_sel)
+    else:
+        filter_params = (filt1, market_brand_sel, format_sel)
+
+    fig, payload = figure_cache.get_or_build(plot_price_history, version, params=filter_params,
+                                             df=df_filter, group="Producto_sku", title="Price over Time")
+    chart_payload['Price over time'] = show_figure(fig, payload)
 
     with st.expander("Explore data"):
         AgGrid(df_filter[['Fecha', 'Producto_sku', 'Precio', 'Market_Place']],
@@ -140,6 +115,11 @@ else:
                key="Toilet", reload_data=True,  # gridOptions=gridoptions,
                enable_enterprise_modules=True)
 
+        # Export of the filtered history
+        export_table(df_filter[['Fecha', 'Market_Place', 'Fabricante', 'Producto', 'SKU', 'Tipo', 'Linea', 'Precio',
+                                'Moneda', 'URL']],
+                     key="history", file_name="price_history")
+
     # --------------------------------------------------------------------------------------------------------------
     # Information from the product
     st.subheader("Information about the Product")
@@ -165,7 +145,7 @@ else:
 st.header('2) Comparison Products Mansfield')
 
 # Mansfield df
-Mansfield_df = df[df["Fabricante"] == 'Mansfield']
+Mansfield_df = filter_history(source, brand='Mansfield')
 
 cc1, cc2 = st.columns((1, 3))
 # filtering by format
@@ -188,10 +168,7 @@ mansfield_product = Mansfield_df[Mansfield_df['Producto'] == mansfield_product_s
 sku_mansfield = mansfield_product.iloc[-1]['SKU']
 
 # Products to visualize
-sku_comp = comp_df[comp_df['Homologo'] == str(sku_mansfield)]['Sku']
-
-# Filter df
-df_comp = df[df['SKU_str'].isin(list(sku_comp))]
+df_comp = compare_products(source, comp_df, sku_mansfield)
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Visualization of the products and multiplier selection
@@ -202,11 +179,14 @@ df_comp = visual_info_multiplier(df_comp)
 # Line separation
 st.markdown("""---""")
 
-# Plot price index
-fig = plot_price_history_index(df=df_comp, group="Producto_sku", mansfield_prod=mansfield_product_sel,
-                               title=f"Mansfield Price index for {mansfield_product_sel}", orient_h=True)
+# Plot price index (df_comp only depends on the product selected, the master database and the multipliers)
+fig, payload = figure_cache.get_or_build(plot_price_history_index, version, params=(mansfield_product_sel,),
+                                         multipliers=multiplier_vector(df_comp),
+                                         df=df_comp, group="Producto_sku", mansfield_prod=mansfield_product_sel,
+                                         title=f"Mansfield Price index for {mansfield_product_sel}",
+                                         orient_h=True)
 fig.update_layout(height=500)
-st.plotly_chart(fig, use_container_width=True)
+chart_payload['Price index'] = show_figure(fig, payload)
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Price index summary and data explorer
@@ -214,16 +194,14 @@ st.plotly_chart(fig, use_container_width=True)
 st.markdown("""---""")
 
 # Price index
-df_info_price = df_comp[df_comp['Fecha'] == df_comp['Fecha'].iloc[-1]].copy()
-mansfield_ref = df_info_price[df_info_price['Producto'] == mansfield_product_sel]['Precio_factor'].values
-df_info_price['Price_index'] = np.round(((mansfield_ref / df_info_price['Precio_factor']) * 100), 2)
+df_info_price = price_index_table(df_comp, mansfield_product_sel, price_col='Precio_factor')
 
 # Calculating overall price index
-overall_price_index = np.round((df_info_price['Price_index'].abs().sum() - 100) / (len(df_info_price) - 1), 2)
+overall_index = overall_price_index(df_info_price)
 
 ccc1, ccc2 = st.columns((1, 8))
 with ccc1:
-    st.metric(label="Overall Price Index", value=f"{overall_price_index}%")
+    st.metric(label="Overall Price Index", value=f"{overall_index}%")
 
 with ccc2:
     AgGrid(df_info_price[['Fecha', 'Market_Place', 'Linea', 'Producto', 'Precio', 'Precio_factor',
@@ -233,3 +211,17 @@ with ccc2:
            key="price_index", reload_data=True,  # gridOptions=gridoptions,
            enable_enterprise_modules=False)
 
+# Export of the price index table
+export_table(df_info_price[['Fecha', 'Market_Place', 'Linea', 'Producto', 'Precio', 'Precio_factor',
+                            'Price_index', 'URL']],
+             key="price_index", file_name=f"price_index_{sku_mansfield}")
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Figure cache counters and chart payload
+cache_stats = figure_cache.stats()
+st.sidebar.caption("Figure cache: {hits} hits | {misses} misses | {size}/{maxsize} figures".format(**cache_stats))
+
+# Size of the charts sent to the browser
+for chart_name, report in chart_payload.items():
+    st.sidebar.caption(f"{chart_name} payload: {format_report(report)}")
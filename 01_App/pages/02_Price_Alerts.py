@@ -0,0 +1,75 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import streamlit as st
+from sources.data_loader import DATA_DIRECTORY, MASTER_FILE, load_master, load_source
+from sources.price_alerts import ROLLING_WINDOW, largest_moves, price_index_alerts, rolling_stage
+from sources.tools import export_table
+from st_aggrid import AgGrid
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Configuration and Global Variables
+# ----------------------------------------------------------------------------------------------------------------------
+# Loading the files, or the embedded database if configured
+source, version = load_source(DATA_DIRECTORY)
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Loading the Master Database
+comp_df = load_master(MASTER_FILE)
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Rolling statistics, computed once per data version (precomputed in the snapshot). The alerts only use the two last
+# days: the moves of the last day and the price index of the last day against the previous one
+df_stats = rolling_stage(source, version, last_dates=2)
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Streamlit Setting
+# ----------------------------------------------------------------------------------------------------------------------
+st.set_page_config(page_title="Price Monitoring",
+                   initial_sidebar_state="collapsed",
+                   page_icon="📈",
+                   layout="wide")
+
+st.title('🚨 Price Alerts')
+st.markdown(f"Last data: **{df_stats['Fecha'].max()}** | Rolling window of {ROLLING_WINDOW} records by product")
+# ----------------------------------------------------------------------------------------------------------------------
+# ----------------------------------------------------------------------------------------------------------------------
+st.header('1) Largest Price Moves')
+
+c1, c2 = st.columns((1, 3))
+top = c1.number_input('How many products wants to see?', min_value=5, max_value=200, value=20, step=5)
+brand_sel = c2.selectbox("Which brand wants to visualize?", ['All'] + list(df_stats["Fabricante"].unique()))
+
+df_moves = largest_moves(df_stats if brand_sel == 'All' else df_stats[df_stats["Fabricante"] == brand_sel], top)
+
+AgGrid(df_moves[['Fecha', 'Market_Place', 'Fabricante', 'Producto_sku', 'Precio', 'Change', 'Rolling_min',
+                 'Rolling_max', 'Volatility']],
+       editable=False, sortable=True, filter=True, resizable=True, defaultWidth=5, height=300,
+       fit_columns_on_grid_load=False, theme="streamlit",  # "light", "dark", "blue", "material"
+       key="price_moves", reload_data=True,  # gridOptions=gridoptions,
+       enable_enterprise_modules=False)
+
+export_table(df_moves, key="price_moves", file_name="price_moves")
+
+# ----------------------------------------------------------------------------------------------------------------------
+st.header('2) Mansfield Price Index Outside the Band')
+
+band = st.slider('Accepted price index band (%)', 40.0, 200.0, (80.0, 120.0), step=1.0)
+
+df_alerts = price_index_alerts(df_stats, comp_df, band)
+
+cc1, cc2 = st.columns((1, 8))
+with cc1:
+    st.metric(label="Pairs outside the band", value=len(df_alerts))
+    st.metric(label="New alerts", value=int(df_alerts['New_alert'].sum()))
+
+with cc2:
+    AgGrid(df_alerts,
+           editable=False, sortable=True, filter=True, resizable=True, defaultWidth=5, height=300,
+           fit_columns_on_grid_load=False, theme="streamlit",  # "light", "dark", "blue", "material"
+           key="price_alerts", reload_data=True,  # gridOptions=gridoptions,
+           enable_enterprise_modules=False)
+
+export_table(df_alerts, key="price_alerts", file_name="price_index_alerts")
@@ -0,0 +1,150 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import os
+import json
+import zlib
+import base64
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Configuration and Global Variables
+# ----------------------------------------------------------------------------------------------------------------------
+# 'binary' sends the chart arrays as typed arrays (needs plotly.js >= 2.28, loaded from PLOTLY_JS_CDN), 'json' keeps
+# st.plotly_chart for old front ends
+CHART_ENCODING = os.environ.get("PRICING_CHART_ENCODING", "json")
+PLOTLY_JS_CDN = "https://cdn.plot.ly/plotly-2.35.2.min.js"
+
+# Arrays shorter than this are kept as json
+MIN_BINARY_LENGTH = 8
+
+# Typed arrays: prices as float32, dates as milliseconds since epoch (float64 to keep the day exact)
+PRICE_DTYPE = '<f4'
+DATE_DTYPE = '<f8'
+DTYPE_CODES = {'<f4': 'f4', '<f8': 'f8'}
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Function Definition
+# ----------------------------------------------------------------------------------------------------------------------
+def typed_array(values, dtype):
+    """
+    Función que codifica un arreglo como typed array de plotly.js ({dtype, bdata} en base64).
+    """
+    array = np.ascontiguousarray(np.asarray(values, dtype=dtype))
+    return {'dtype': DTYPE_CODES[dtype], 'bdata': base64.b64encode(array.tobytes()).decode('ascii')}
+
+
+def _encode_values(values):
+    """
+    Función que codifica los valores de un eje: números como float32 y fechas como milisegundos. Devuelve None si los
+    valores deben quedar en json (texto, categorías o arreglos cortos).
+    """
+    if not isinstance(values, (list, np.ndarray)) or len(values) < MIN_BINARY_LENGTH:
+        return None, None
+
+    values = np.asarray(values, dtype=object)
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+        return typed_array(values.astype(float), PRICE_DTYPE), 'number'
+
+    try:
+        dates = pd.to_datetime(pd.Series(values), format='%Y-%m-%d')
+    except (ValueError, TypeError):
+        try:
+            dates = pd.to_datetime(pd.Series(values), format='%Y-%m-%dT%H:%M:%S')
+        except (ValueError, TypeError):
+            return None, None
+
+    milliseconds = (dates - pd.Timestamp('1970-01-01')) // pd.Timedelta(milliseconds=1)
+    return typed_array(milliseconds.values, DATE_DTYPE), 'date'
+
+
+def encode_figure(fig_dict):
+    """
+    Función que reemplaza los arreglos x/y de cada trace por typed arrays binarios. Los ejes con fechas codificadas se
+    marcan como tipo 'date' para que plotly.js interprete los milisegundos.
+    :param fig_dict: Figura como diccionario (json.loads(fig.to_json())).
+    :return: fig_dict: Figura codificada (nuevo diccionario).
+    """
+    encoded = dict(fig_dict, data=[dict(trace) for trace in fig_dict.get('data', [])],
+                   layout=dict(fig_dict.get('layout', {})))
+
+    for trace in encoded['data']:
+        for axis in ('x', 'y'):
+            array, kind = _encode_values(trace.get(axis))
+            if array is None:
+                continue
+            trace[axis] = array
+            if kind == 'date':
+                # 'x2' -> 'xaxis2'
+                axis_name = trace.get(f'{axis}axis', axis).replace(axis, f'{axis}axis', 1)
+                encoded['layout'][axis_name] = dict(encoded['layout'].get(axis_name, {}), type='date')
+
+    return encoded
+
+
+def payload_report(fig_json, encoded_json=None):
+    """
+    Función que mide el tamaño de la figura enviada al navegador, sin comprimir y comprimida con zlib (websocket).
+    :param fig_json: Figura serializada en json.
+    :param encoded_json: Figura con typed arrays serializada en json, si se calculó.
+    :return: report: Diccionario con los bytes en json y en binario, sin comprimir y comprimidos.
+    """
+    report = {}
+    for name, text in (('json', fig_json), ('binary', encoded_json)):
+        if text is not None:
+            data = text.encode('utf-8')
+            report[f'{name}_bytes'] = len(data)
+            report[f'{name}_compressed_bytes'] = len(zlib.compress(data, 6))
+
+    return report
+
+
+def figure_payload(fig_json, encoding=CHART_ENCODING):
+    """
+    Función que prepara lo que se envía al navegador de una figura: la versión con typed arrays (solo con la
+    codificación 'binary') y el reporte de tamaño. Se calcula una vez por figura (ver FigureCache).
+    :param fig_json: Figura serializada en json.
+    :param encoding: Codificación de las gráficas ('json' o 'binary').
+    :return: payload: Diccionario con encoded_json (None en modo json) y report.
+    """
+    encoded_json = json.dumps(encode_figure(json.loads(fig_json))) if encoding == 'binary' else None
+
+    return {'encoded_json': encoded_json, 'report': payload_report(fig_json, encoded_json)}
+
+
+def figure_html(encoded_json, height):
+    """
+    Función que arma el html que dibuja la figura con plotly.js, para los navegadores que soportan typed arrays.
+    :param encoded_json: Figura con typed arrays serializada en json.
+    :param height: Altura de la gráfica en pixeles.
+    :return: html: Texto html para streamlit.components.v1.html.
+    """
+    # '</' would close the script tag
+    encoded_json = encoded_json.replace('</', '<\\/')
+
+    return f"""
+    <div id="chart" style="width:100%;height:{height}px;"></div>
+    <script src="{PLOTLY_JS_CDN}"></script>
+    <script>
+        var figure = {encoded_json};
+        figure.layout.height = {height};
+        Plotly.newPlot('chart', figure.data, figure.layout, {{responsive: true, displaylogo: false}});
+    </script>
+    """
+
+
+def format_report(report):
+    """
+    Función que arma el texto del tamaño de la figura para la barra lateral.
+    """
+    sizes = []
+    for name in ('json', 'binary'):
+        if f'{name}_bytes' in report:
+            sizes.append(f"{name} {report[f'{name}_bytes'] / 1024:.1f} KB "
+                         f"({report[f'{name}_compressed_bytes'] / 1024:.1f} KB compressed)")
+    return ' | '.join(sizes)
@@ -0,0 +1,103 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import numpy as np
+import pandas as pd
+
+from sources.sql_backend import FILTER_COLUMNS
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Configuration and Global Variables
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Function Definition
+# ----------------------------------------------------------------------------------------------------------------------
+# The source of every filter is the history in memory (data frame), the embedded database (sql_backend.PriceDatabase)
+# or the memory-mapped snapshot (snapshot.PriceSnapshot). In the last two cases the filter is pushed down to the
+# source, which implements the same functions as methods.
+def filter_history(source, skus=None, products=None, **predicates):
+    """
+    Función que filtra el historico de precios.
+    :param source: data frame con los precios y la historia, PriceDatabase o PriceSnapshot.
+    :param skus: Lista de SKU a conservar.
+    :param products: Lista de Producto_sku a conservar.
+    :param predicates: Filtros de igualdad: market_place, brand, sku, tipo.
+    :return: df_filter: data frame filtrado.
+    """
+    if not isinstance(source, pd.DataFrame):
+        return source.filter_history(skus=skus, products=products, **predicates)
+
+    mask = np.ones(len(source), dtype=bool)
+    for key, value in predicates.items():
+        if value is not None:
+            # SKU_str is compared as text, the SKU can be given as number
+            value = str(value) if key == 'sku' else value
+            mask &= (source[FILTER_COLUMNS[key]] == value).values
+    if skus is not None:
+        mask &= source['SKU_str'].isin([str(sku) for sku in skus]).values
+    if products is not None:
+        mask &= source['Producto_sku'].isin(list(products)).values
+
+    return source[mask]
+
+
+def distinct_values(source, column, **predicates):
+    """
+    Función que devuelve los valores únicos de una columna, en orden de aparición.
+    """
+    if not isinstance(source, pd.DataFrame):
+        return source.distinct_values(column, **predicates)
+
+    return filter_history(source, **predicates)[column].unique()
+
+
+def min_price(source):
+    """
+    Función que devuelve el precio mínimo del historico.
+    """
+    if not isinstance(source, pd.DataFrame):
+        return source.min_price()
+
+    return source['Precio'].min()
+
+
+def filter_price_range(source, low, high):
+    """
+    Función que devuelve el historico completo de los productos cuyo último precio está en el rango indicado.
+    :param source: data frame con los precios y la historia, PriceDatabase o PriceSnapshot.
+    :param low: Precio mínimo.
+    :param high: Precio máximo.
+    :return: df_filter: data frame filtrado.
+    """
+    if not isinstance(source, pd.DataFrame):
+        df_filter_aux = source.latest_prices_in_range(low, high)
+    else:
+        # Filtering the price by the last data
+        df_filter_aux = source[(source["Precio"] >= low) & (source["Precio"] <= high) &
+                               (source["Fecha"] == source["Fecha"].max())]
+
+    return filter_history(source, products=df_filter_aux['Producto_sku'].unique())
+
+
+def compare_products(source, comp_df, sku_mansfield):
+    """
+    Función que filtra el historico con el producto Mansfield y sus homologos de la competencia.
+    :param source: data frame con los precios y la historia, PriceDatabase o PriceSnapshot.
+    :param comp_df: data frame maestro con la relación Homologo - Sku.
+    :param sku_mansfield: SKU del producto Mansfield.
+    :return: df_comp: data frame con el historico de los productos a comparar.
+    """
+    if not isinstance(source, pd.DataFrame):
+        return source.compare_products(sku_mansfield)
+
+    # Products to visualize, the Sku of the excel can be a number or have spaces (compared as text, as the sources do)
+    sku_comp = comp_df[comp_df['Homologo'] == str(sku_mansfield)]['Sku'].map(str).str.strip()
+
+    # Filter df
+    df_comp = source[source['SKU_str'].isin(list(sku_comp))]
+
+    return df_comp
@@ -0,0 +1,104 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import os
+
+import pandas as pd
+
+from sources.figure_cache import data_version
+from sources.snapshot import open_snapshot
+from sources.sql_backend import open_database
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Configuration and Global Variables
+# ----------------------------------------------------------------------------------------------------------------------
+# Folder path definition
+DATA_DIRECTORY = './data'
+MASTER_FILE = 'sources/Productos Mansfield.xlsx'
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Function Definition
+# ----------------------------------------------------------------------------------------------------------------------
+def load_data(filename="Decorceramica_twopieces.csv"):
+    """
+    Función que carga el archivo csv guardado al conectar con la base de datos y devuelve un dataframe
+    """
+    df = pd.read_csv(filename)
+
+    return df
+
+
+def list_data_files(directory=DATA_DIRECTORY):
+    """
+    Función que lista los archivos de datos guardados por el robot en la carpeta indicada.
+    :param directory: Carpeta con los archivos csv de cada mes.
+    :return: files_list: Lista ordenada con la ruta de cada archivo (el orden de os.walk depende del disco).
+    """
+    files_list = []
+    for path, _, files in os.walk(directory):
+        for name in files:
+            files_list.append(os.path.join(path, name))
+
+    return sorted(files_list)
+
+
+def load_history(files_list):
+    """
+    Función que carga el historico de precios de todos los archivos en un único dataframe.
+    :param files_list: Lista con la ruta de los archivos csv.
+    :return: df: Dataframe con el historico de precios.
+    """
+    # Loading the DF of each month in a unique DF
+    df = pd.concat([load_data(filename=file) for file in files_list])
+
+    # Dropping duplicates in case the robot take two values by day
+    df.drop_duplicates(inplace=True)
+
+    # Creating a new product name combining the product name + sku
+    df['Producto_sku'] = ['_'.join(i) for i in zip(df['Producto'], df['SKU'].map(str))]
+
+    # String the SKU
+    df['SKU_str'] = df['SKU'].map(str)
+
+    return df
+
+
+def load_master(filename=MASTER_FILE):
+    """
+    Función que carga la base de datos maestra con los homologos de cada producto Mansfield.
+    :param filename: Ruta del archivo excel.
+    :return: comp_df: Dataframe con la relación Homologo - Sku.
+    """
+    # Reading files with the directory for comparisons
+    comp_df = pd.read_excel(filename)
+
+    # Organizing the SKU
+    comp_df['Homologo'] = comp_df['Homologo Mansfield'].map(str)
+    comp_df['Homologo'] = comp_df['Homologo'].apply(lambda x: x.strip())
+
+    return comp_df
+
+
+def load_source(directory=DATA_DIRECTORY):
+    """
+    Función que abre la fuente de datos del dashboard: el snapshot mapeado en memoria si está configurado (ver
+    snapshot.open_snapshot), la base de datos embebida (ver sql_backend.open_database) o el historico de los archivos
+    csv cargado en memoria.
+    :param directory: Carpeta con los archivos csv de cada mes.
+    :return: (source, version): data frame, PriceSnapshot o PriceDatabase y la versión de los datos para el cache de
+    gráficas.
+    """
+    snapshot = open_snapshot()
+    if snapshot is not None:
+        return snapshot, snapshot.version
+
+    db = open_database()
+    if db is not None:
+        return db, db.version
+
+    files_list = list_data_files(directory)
+
+    return load_history(files_list), data_version(files_list)
@@ -0,0 +1,162 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import io
+import tempfile
+
+import pandas as pd
+from openpyxl import Workbook
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Configuration and Global Variables
+# ----------------------------------------------------------------------------------------------------------------------
+# Rows written on each chunk
+EXPORT_CHUNK_ROWS = 20000
+
+# Size of each block of bytes delivered by the generators
+EXPORT_BLOCK_BYTES = 1024 * 1024
+
+# Formats available: extension and mime type
+EXPORT_FORMATS = {'CSV': ('csv', 'text/csv'),
+                  'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')}
+if pa is not None:
+    EXPORT_FORMATS['Parquet'] = ('parquet', 'application/vnd.apache.parquet')
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Function Definition
+# ----------------------------------------------------------------------------------------------------------------------
+class _ChunkSink(io.RawIOBase):
+    """
+    File-like object that keeps the bytes written until they are drained, used by the parquet writer. tell() returns
+    the total bytes written so the offsets of the footer stay valid.
+    """
+    def __init__(self):
+        super().__init__()
+        self._blocks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._blocks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._blocks)
+        self._blocks = []
+        return data
+
+
+def iter_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Función que divide el data frame en bloques de filas. Un data frame vacío da un bloque vacío, para que los archivos
+    tengan encabezado / esquema.
+    """
+    if len(df) == 0:
+        yield df.iloc[:0]
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def iter_csv(chunks):
+    """
+    Función generadora que entrega el archivo csv por bloques.
+    :param chunks: Iterable de data frames con las mismas columnas.
+    """
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode('utf-8')
+        header = False
+
+
+def iter_parquet(chunks):
+    """
+    Función generadora que entrega el archivo parquet por bloques, un row group por cada bloque de filas.
+    :param chunks: Iterable de data frames con las mismas columnas.
+    """
+    sink = _ChunkSink()
+    writer = None
+    for chunk in chunks:
+        # Text columns as str (the robot mixes numeric and text SKUs), missing values stay null
+        text_columns = chunk.columns[chunk.dtypes == object]
+        chunk = chunk.assign(**{column: chunk[column].map(lambda x: x if pd.isna(x) else str(x))
+                                for column in text_columns})
+
+        if writer is None:
+            # Schema fixed by the first chunk, a text column without values there is still a string
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            for column in text_columns:
+                schema = schema.set(schema.get_field_index(column), pa.field(column, pa.string()))
+            writer = pq.ParquetWriter(sink, schema)
+        writer.write_table(pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False))
+        yield sink.drain()
+
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+def iter_xlsx(chunks, sheet_name='Data'):
+    """
+    Función generadora que entrega el archivo excel por bloques. Las filas se escriben con un workbook write-only y el
+    archivo se arma en un archivo temporal (en memoria hasta EXPORT_BLOCK_BYTES), por lo que los bytes se entregan
+    una vez todas las filas fueron escritas.
+    :param chunks: Iterable de data frames con las mismas columnas.
+    :param sheet_name: Nombre de la hoja.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+
+    header = True
+    for chunk in chunks:
+        if header:
+            sheet.append(list(chunk.columns))
+            header = False
+        # Empty cells instead of NaN
+        for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False):
+            sheet.append(list(row))
+
+    with tempfile.SpooledTemporaryFile(max_size=EXPORT_BLOCK_BYTES) as file:
+        workbook.save(file)
+        file.seek(0)
+        for block in iter(lambda: file.read(EXPORT_BLOCK_BYTES), b''):
+            yield block
+
+
+def iter_export(df, export_format, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Función generadora que exporta el data frame en el formato indicado, bloque por bloque.
+    :param df: data frame a exportar.
+    :param export_format: Llave de EXPORT_FORMATS ('CSV', 'Excel' o 'Parquet').
+    :param chunk_rows: Número de filas de cada bloque.
+    """
+    writers = {'CSV': iter_csv, 'Excel': iter_xlsx, 'Parquet': iter_parquet}
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Export format {export_format} not available, use one of {list(EXPORT_FORMATS)}")
+
+    return writers[export_format](iter_chunks(df, chunk_rows))
+
+
+def export_to_file(df, path, export_format, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Función que escribe el data frame exportado en un archivo sin armarlo completo en memoria.
+    """
+    with open(path, 'wb') as file:
+        for block in iter_export(df, export_format, chunk_rows):
+            file.write(block)
+
+    return path
@@ -0,0 +1,107 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+
+from sources.chart_encoding import figure_payload
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Configuration and Global Variables
+# ----------------------------------------------------------------------------------------------------------------------
+# Maximum number of serialized figures kept in memory
+FIGURE_CACHE_SIZE = int(os.environ.get("FIGURE_CACHE_SIZE", 64))
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Function Definition
+# ----------------------------------------------------------------------------------------------------------------------
+def data_version(files_list):
+    """
+    Función que calcula la versión de los datos a partir de los archivos cargados (ruta, tamaño y fecha de
+    modificación). Cambia cada vez que el robot agrega o modifica un archivo.
+    :param files_list: Lista con la ruta de los archivos csv cargados.
+    :return: version: Texto corto que identifica la versión de los datos.
+    """
+    digest = hashlib.sha1()
+    for file in sorted(files_list):
+        stat = os.stat(file)
+        digest.update(f"{file}|{stat.st_size}|{stat.st_mtime_ns};".encode())
+
+    return digest.hexdigest()[:12]
+
+
+class FigureCache:
+    """
+    LRU cache of serialized plotly figures. The key is built with the builder name, the filter parameters, the
+    multiplier vector and the data version, so a hit is only possible when the chart would be identical. The payload
+    sent to the browser (see chart_encoding.figure_payload) is stored with the figure.
+    """
+    def __init__(self, maxsize=FIGURE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._store = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, builder, version, params=(), multipliers=(), **kwargs):
+        """
+        Función que devuelve la figura guardada en cache o la construye con el builder y la guarda serializada, junto
+        con el payload de la figura (typed arrays y reporte de tamaño) calculado una sola vez. El df de kwargs no es
+        parte de la llave: version, params y multipliers deben determinar por completo los datos entregados al builder.
+        :param builder: Función de plot_function que construye la figura.
+        :param version: Versión de los datos (ver data_version), de los archivos y de la base maestra si se usa.
+        :param params: Tupla con los parámetros del filtro que definen el df entregado al builder.
+        :param multipliers: Tupla con los factores multiplicadores aplicados a los precios.
+        :param kwargs: Argumentos del builder (df, title, orient_h, ...).
+        :return: (fig, payload): Objeto de plotly y diccionario de chart_encoding.figure_payload.
+        """
+        key = (builder.__name__, tuple(params), tuple(multipliers), version)
+
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is not None:
+                self._store.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is None:
+            fig_json = builder(**kwargs).to_json()
+            entry = (fig_json, figure_payload(fig_json))
+            with self._lock:
+                self._store[key] = entry
+                self._store.move_to_end(key)
+                while len(self._store) > self.maxsize:
+                    self._store.popitem(last=False)
+
+        # The stored figure was already validated when it was built
+        fig_json, payload = entry
+        return go.Figure(json.loads(fig_json), _validate=False), payload
+
+    def stats(self):
+        """
+        Función que devuelve los contadores del cache.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._store), "maxsize": self.maxsize}
+
+    def clear(self):
+        """
+        Función que vacía el cache y reinicia los contadores.
+        """
+        with self._lock:
+            self._store.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Shared by every session of the streamlit server process
+figure_cache = FigureCache()
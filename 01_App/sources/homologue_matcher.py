@@ -0,0 +1,203 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.neighbors import NearestNeighbors
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Configuration and Global Variables
+# ----------------------------------------------------------------------------------------------------------------------
+# Character n-grams of the names, robust to abbreviations and typos of the marketplaces
+MATCH_NGRAMS = (3, 4)
+
+# Product types compared in the same block (a CTK is sold as a combo by some marketplaces)
+TYPE_BLOCKS = {'CTK': 'Combo'}
+
+# Candidates looked up by product and suggestions kept
+MATCH_NEIGHBORS = 10
+MATCH_SUGGESTIONS = 3
+
+# Minimum cosine similarity of a suggestion
+MIN_SIMILARITY = 0.1
+
+# Accepted ratio between the competitor price and the Mansfield price (same currency)
+PRICE_BAND = (0.5, 2.0)
+
+# Columns of the suggestions file, the first ones are the columns of the master database
+SUGGESTION_COLUMNS = ['Fabricante', 'Homologo Mansfield', 'Sku', 'Type', 'Linea', 'Short Name', 'Link',
+                      'Producto_Mansfield', 'Similarity', 'Precio', 'Precio_Mansfield', 'Price_ratio', 'Rank',
+                      'Approved']
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Function Definition
+# ----------------------------------------------------------------------------------------------------------------------
+def normalize_name(text, brand=''):
+    """
+    Función que normaliza el nombre de un producto para compararlo: minúsculas, sin tildes, decimales con punto y sin
+    las palabras de la marca (todos los nombres de una marca las comparten).
+    """
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii').lower()
+    text = re.sub(r'(\d),(\d)', r'\1.\2', text)
+    for word in str(brand).lower().split():
+        text = re.sub(rf'\b{re.escape(word)}\b', ' ', text)
+
+    return ' '.join(re.sub(r'[^a-z0-9.]+', ' ', text).split())
+
+
+def _latest_products(df):
+    """
+    Función que devuelve el último registro de cada SKU del historico.
+    """
+    return df.drop_duplicates('SKU_str', keep='last').set_index('SKU_str')
+
+
+def mansfield_catalog(df, comp_df):
+    """
+    Función que arma el catálogo Mansfield contra el que se buscan los homologos: nombres de la base maestra y del
+    robot, tipo, línea y último precio.
+    :param df: data frame con los precios y la historia (ver load_history).
+    :param comp_df: data frame maestro (ver load_master).
+    :return: df_catalog: Dataframe con una fila por producto Mansfield.
+    """
+    df_catalog = comp_df[comp_df['Fabricante'] == 'Mansfield'].copy()
+    df_catalog['Homologo'] = df_catalog['Sku'].map(str).str.strip()
+    df_catalog = df_catalog.drop_duplicates('Homologo')
+
+    # Name and last price scraped for each product
+    df_last = _latest_products(df[df['Fabricante'] == 'Mansfield'])
+    scraped = df_catalog['Homologo'].map(df_last['Producto']).fillna('')
+    df_catalog['Precio_Mansfield'] = df_catalog['Homologo'].map(df_last['Precio'])
+    df_catalog['Moneda_Mansfield'] = df_catalog['Homologo'].map(df_last['Moneda'])
+    df_catalog['Producto_Mansfield'] = df_catalog['Short Name'].fillna(scraped)
+
+    texts = df_catalog[['Short Name', 'Descripcion', 'Linea']].fillna('').astype(str).agg(' '.join, axis=1)
+    df_catalog['Text'] = [normalize_name(f'{text} {name}', 'Mansfield') for text, name in zip(texts, scraped)]
+
+    return df_catalog[['Homologo', 'Type', 'Linea', 'Producto_Mansfield', 'Precio_Mansfield', 'Moneda_Mansfield',
+                       'Text']].reset_index(drop=True)
+
+
+def unmapped_products(df, comp_df):
+    """
+    Función que devuelve los productos de la competencia scrapeados que no están en la base maestra (último registro
+    de cada SKU).
+    :param df: data frame con los precios y la historia (ver load_history).
+    :param comp_df: data frame maestro (ver load_master).
+    :return: df_products: Dataframe con una fila por producto sin homologo.
+    """
+    mapped = set(comp_df['Sku'].map(str).str.strip())
+    df_last = _latest_products(df[df['Fabricante'] != 'Mansfield']).reset_index()
+
+    return df_last[~df_last['SKU_str'].isin(mapped)].reset_index(drop=True)
+
+
+def suggest_homologues(df_products, df_catalog, neighbors=MATCH_NEIGHBORS, suggestions=MATCH_SUGGESTIONS,
+                       min_similarity=MIN_SIMILARITY, price_band=PRICE_BAND):
+    """
+    Función que propone los homologos Mansfield de cada producto. Los nombres se vectorizan con TF-IDF de n-gramas de
+    caracteres y se buscan los vecinos más cercanos (coseno) solo dentro del mismo tipo de producto; los candidatos
+    con un precio fuera de la banda se descartan.
+    :param df_products: Productos a homologar (ver unmapped_products).
+    :param df_catalog: Catálogo Mansfield (ver mansfield_catalog).
+    :param neighbors: Candidatos buscados por producto.
+    :param suggestions: Sugerencias conservadas por producto.
+    :param min_similarity: Similitud mínima de una sugerencia.
+    :param price_band: Rango aceptado de precio competencia / precio Mansfield.
+    :return: df_suggestions: Dataframe con las columnas de SUGGESTION_COLUMNS ordenado por producto y rank.
+    """
+    if df_products.empty or df_catalog.empty:
+        return pd.DataFrame(columns=SUGGESTION_COLUMNS)
+
+    product_texts = [normalize_name(f'{name} {line}', brand) for name, line, brand in
+                     zip(df_products['Producto'], df_products['Linea'].fillna(''), df_products['Fabricante'])]
+
+    # A single vocabulary for both sides
+    vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=MATCH_NGRAMS, sublinear_tf=True)
+    vectorizer.fit(list(df_catalog['Text']) + product_texts)
+    product_vectors = vectorizer.transform(product_texts)
+    catalog_vectors = vectorizer.transform(df_catalog['Text'])
+
+    # Blocking by product type, the products with an unknown type are searched in the whole catalog
+    catalog_types = df_catalog['Type'].fillna('').astype(str).str.strip().replace(TYPE_BLOCKS)
+    product_types = df_products['Tipo'].fillna('').astype(str).str.strip().replace(TYPE_BLOCKS)
+    product_types = product_types.where(product_types.isin(set(catalog_types)), '')
+
+    matches = []
+    for product_type, product_rows in product_types.groupby(product_types).groups.items():
+        catalog_rows = np.flatnonzero(catalog_types == product_type) if product_type else np.arange(len(df_catalog))
+        index = NearestNeighbors(n_neighbors=min(neighbors, len(catalog_rows)), metric='cosine')
+        index.fit(catalog_vectors[catalog_rows])
+
+        product_rows = np.asarray(product_rows)
+        distances, positions = index.kneighbors(product_vectors[product_rows])
+        matches.append(pd.DataFrame({'product': np.repeat(product_rows, positions.shape[1]),
+                                     'catalog': catalog_rows[positions.ravel()],
+                                     'Similarity': np.round(1 - distances.ravel(), 4)}))
+
+    df_match = pd.concat(matches, ignore_index=True)
+    df_match = df_match[df_match['Similarity'] >= min_similarity]
+
+    # Price band, only when both prices are in the same currency
+    product = df_products.iloc[df_match['product']].reset_index(drop=True)
+    catalog = df_catalog.iloc[df_match['catalog']].reset_index(drop=True)
+    ratio = (product['Precio'] / catalog['Precio_Mansfield']).where(product['Moneda'] == catalog['Moneda_Mansfield'])
+    in_band = ratio.isna() | ratio.between(*price_band)
+
+    df_suggestions = pd.DataFrame({'Fabricante': product['Fabricante'], 'Homologo Mansfield': catalog['Homologo'],
+                                   'Sku': product['SKU_str'], 'Type': product['Tipo'], 'Linea': product['Linea'],
+                                   'Short Name': product['Producto'], 'Link': product['URL'],
+                                   'Producto_Mansfield': catalog['Producto_Mansfield'],
+                                   'Similarity': df_match['Similarity'].values, 'Precio': product['Precio'],
+                                   'Precio_Mansfield': catalog['Precio_Mansfield'], 'Price_ratio': np.round(ratio, 3),
+                                   'Approved': ''})[in_band.values]
+
+    df_suggestions = df_suggestions.sort_values(['Sku', 'Similarity'], ascending=[True, False], kind='stable')
+    df_suggestions['Rank'] = df_suggestions.groupby('Sku').cumcount() + 1
+
+    return df_suggestions[df_suggestions['Rank'] <= suggestions][SUGGESTION_COLUMNS].reset_index(drop=True)
+
+
+def merge_approved(df_master, df_suggestions):
+    """
+    Función que agrega a la base maestra las sugerencias aprobadas en la revisión (columna Approved = 'Si').
+    :param df_master: Base maestra tal como está en el excel (sin las columnas de load_master).
+    :param df_suggestions: Archivo de sugerencias revisado.
+    :return: df_master: Base maestra con las nuevas relaciones Homologo - Sku.
+    """
+    approved = df_suggestions['Approved'].fillna('').astype(str).str.strip().str.lower().isin(['si', 'sí', 'yes', 'x'])
+    df_new = df_suggestions.loc[approved, [column for column in SUGGESTION_COLUMNS if column in df_master.columns]]
+
+    # A product is added once, with the first approved homologue
+    mapped = set(df_master['Sku'].map(str).str.strip())
+    df_new = df_new[~df_new['Sku'].map(str).str.strip().isin(mapped)].drop_duplicates('Sku')
+
+    return pd.concat([df_master, df_new], ignore_index=True)
+
+
+def evaluate_matcher(df, comp_df, **kwargs):
+    """
+    Función que mide la calidad del matcher con las relaciones ya mantenidas a mano: los productos mapeados se buscan
+    como si no lo estuvieran y se verifica si su homologo está en las sugerencias.
+    :return: report: Diccionario con el número de productos y la proporción con el homologo en el rank 1 y en las
+    sugerencias.
+    """
+    df_mapped = comp_df[(comp_df['Fabricante'] != 'Mansfield') & comp_df['Homologo Mansfield'].notna()]
+    homologues = dict(zip(df_mapped['Sku'].map(str).str.strip(), df_mapped['Homologo']))
+
+    df_last = _latest_products(df[df['SKU_str'].isin(homologues)]).reset_index()
+    df_suggestions = suggest_homologues(df_last, mansfield_catalog(df, comp_df), **kwargs)
+    hits = df_suggestions['Homologo Mansfield'] == df_suggestions['Sku'].map(homologues)
+
+    products = max(len(df_last), 1)
+    return {'products': len(df_last),
+            'top1': round(hits[df_suggestions['Rank'] == 1].sum() / products, 3),
+            'topk': round(df_suggestions.loc[hits, 'Sku'].nunique() / products, 3)}
@@ -114,8 +114,8 @@ def plot_price_history_index(df, group, mansfield_prod, title, orient_h=False):
                       row=1, col=1)
 
     # Calculating the price index
-    df_index = df[df['Fecha'] == df['Fecha'].iloc[-1]][['Fecha', 'Fabricante',  group, 'Producto',
-                                                        'Precio', 'Precio_factor']]
+    df_index = df[df['Fecha'] == df['Fecha'].max()][['Fecha', 'Fabricante',  group, 'Producto',
+                                                    'Precio', 'Precio_factor']]
     mansfield_ref = df_index[df_index['Producto'] == mansfield_prod]['Precio_factor'].values
 
     df_index['Price_index'] = np.round(((mansfield_ref / df_index['Precio_factor']) * 100), 2)
@@ -217,7 +217,7 @@ def plot_price_index_summary(df, comp_df, sku_list_mansfield, title, orient_h=Fa
         df_comp = df[df['SKU_str'].isin(list(sku_comp))]
 
         # Calculating the price index
-        df_info_price = df_comp[df_comp['Fecha'] == df_comp['Fecha'].iloc[-1]].copy()
+        df_info_price = df_comp[df_comp['Fecha'] == df_comp['Fecha'].max()].copy()
         mansfield_ref = df_info_price[df_info_price['SKU_str'] == sku_mansfield]['Precio'].values
         mansfield_prod = df_info_price[df_info_price['SKU_str'] == sku_mansfield]['Producto_sku'].values
 
@@ -0,0 +1,173 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import threading
+
+import numpy as np
+import pandas as pd
+
+from sources.data_filters import filter_history
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Configuration and Global Variables
+# ----------------------------------------------------------------------------------------------------------------------
+# Number of records of each product used by the rolling statistics
+ROLLING_WINDOW = 7
+
+# Columns of the history kept by the rolling statistics
+BASE_COLUMNS = ['Fecha', 'Producto_sku', 'SKU_str', 'Fabricante', 'Producto', 'Market_Place', 'Precio']
+
+# Rolling statistics of the last data version, shared by every session
+_stage = {}
+_stage_lock = threading.Lock()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Function Definition
+# ----------------------------------------------------------------------------------------------------------------------
+def rolling_statistics(df, window=ROLLING_WINDOW):
+    """
+    Función que calcula en una sola pasada, para cada Producto_sku, el cambio diario del precio (%), el mínimo y
+    máximo móvil y la volatilidad (desviación estándar móvil del cambio diario).
+    :param df: data frame con los precios y la historia.
+    :param window: Número de registros de la ventana móvil.
+    :return: df_stats: data frame ordenado por producto y fecha con las columnas Change, Rolling_min, Rolling_max y
+    Volatility.
+    """
+    # Private columns (e.g. _new of update_rolling_statistics) are kept
+    extra_columns = [column for column in df.columns if column not in BASE_COLUMNS and column.startswith('_')]
+    df_stats = df[BASE_COLUMNS + extra_columns].sort_values(['Producto_sku', 'Fecha'], kind='mergesort')
+    df_stats = df_stats.reset_index(drop=True)
+
+    price = df_stats.groupby('Producto_sku', sort=False)['Precio']
+    df_stats['Change'] = np.round((df_stats['Precio'] / price.shift() - 1) * 100, 2)
+    df_stats['Rolling_min'] = price.rolling(window, min_periods=1).min().reset_index(level=0, drop=True)
+    df_stats['Rolling_max'] = price.rolling(window, min_periods=1).max().reset_index(level=0, drop=True)
+    df_stats['Volatility'] = np.round(df_stats.groupby('Producto_sku', sort=False)['Change']
+                                      .rolling(window, min_periods=2).std().reset_index(level=0, drop=True), 2)
+
+    return df_stats
+
+
+def update_rolling_statistics(df_stats, df_new, window=ROLLING_WINDOW):
+    """
+    Función que agrega los nuevos días a las estadísticas móviles, recalculando solo los últimos registros de cada
+    producto necesarios para la ventana.
+    :param df_stats: data frame calculado con rolling_statistics.
+    :param df_new: data frame con los registros nuevos.
+    :param window: Número de registros de la ventana móvil.
+    :return: df_stats: data frame actualizado.
+    """
+    if len(df_new) == 0:
+        return df_stats
+
+    # window + 1 prices are needed for the volatility of the first new record
+    df_tail = df_stats.groupby('Producto_sku', sort=False).tail(window + 1)[BASE_COLUMNS].assign(_new=False)
+    df_update = rolling_statistics(pd.concat([df_tail, df_new[BASE_COLUMNS].assign(_new=True)]), window)
+    df_update = df_update[df_update['_new']].drop(columns='_new')
+
+    df_stats = pd.concat([df_stats, df_update]).sort_values(['Producto_sku', 'Fecha'], kind='mergesort')
+
+    return df_stats.reset_index(drop=True)
+
+
+def last_dates_of(df_stats, last_dates=None):
+    """
+    Función que devuelve los registros de las últimas fechas de las estadísticas móviles (todos si last_dates es None).
+    """
+    if last_dates is None:
+        return df_stats
+
+    dates = np.sort(df_stats['Fecha'].unique())[-last_dates:]
+    return df_stats[df_stats['Fecha'].isin(dates)].reset_index(drop=True)
+
+
+def rolling_stage(source, version, window=ROLLING_WINDOW, last_dates=None):
+    """
+    Función que devuelve las estadísticas móviles de la versión de los datos. Con un PriceSnapshot se leen las
+    calculadas por build_snapshot; con las otras fuentes se calculan una vez por versión y, cuando la nueva versión
+    solo agrega días posteriores, se actualizan de manera incremental.
+    :param source: data frame con los precios y la historia, PriceDatabase o PriceSnapshot.
+    :param version: Versión de los datos (ver figure_cache.data_version).
+    :param window: Número de registros de la ventana móvil.
+    :param last_dates: Número de fechas a devolver (las últimas), None para todo el historico.
+    :return: df_stats: data frame con las estadísticas móviles.
+    """
+    # Precomputed in the snapshot, only the rows of the requested dates are read from the mapped arrays
+    if hasattr(source, 'rolling_statistics'):
+        df_stats = source.rolling_statistics(window, last_dates)
+        if df_stats is not None:
+            return df_stats
+
+    with _stage_lock:
+        cached = _stage.get(window)
+        if cached is None or cached['version'] != version:
+            # The history is only read when the version changes
+            df = filter_history(source)
+            if cached is not None and (df['Fecha'] <= cached['last_date']).sum() == cached['rows']:
+                df_stats = update_rolling_statistics(cached['stats'], df[df['Fecha'] > cached['last_date']], window)
+            else:
+                df_stats = rolling_statistics(df, window)
+
+            cached = _stage[window] = {'version': version, 'stats': df_stats, 'last_date': df['Fecha'].max(),
+                                       'rows': len(df)}
+
+    return last_dates_of(cached['stats'], last_dates)
+
+
+def largest_moves(df_stats, top=20):
+    """
+    Función que devuelve los mayores cambios de precio del último día.
+    :param df_stats: data frame calculado con rolling_statistics.
+    :param top: Número de productos a mostrar.
+    :return: df_moves: data frame ordenado por el valor absoluto del cambio.
+    """
+    df_last = df_stats[(df_stats['Fecha'] == df_stats['Fecha'].max()) & df_stats['Change'].notna()]
+    order = df_last['Change'].abs().sort_values(ascending=False, kind='mergesort').index
+
+    return df_last.loc[order].head(top)
+
+
+def price_index_alerts(df_stats, comp_df, band=(80, 120)):
+    """
+    Función que calcula el índice de precio de cada par Mansfield - competidor en los dos últimos días y devuelve los
+    que están por fuera de la banda indicada.
+    :param df_stats: data frame calculado con rolling_statistics.
+    :param comp_df: data frame maestro con la relación Homologo - Sku.
+    :param band: Tupla (mínimo, máximo) del índice de precio aceptado.
+    :return: df_alerts: data frame con el índice actual, el anterior y si el último movimiento lo sacó de la banda.
+    """
+    dates = np.sort(df_stats['Fecha'].unique())
+    df_last = df_stats[df_stats['Fecha'].isin(dates[-2:])]
+    prices = df_last.pivot_table(index='SKU_str', columns='Fecha', values='Precio', aggfunc='last')
+    prices = prices.reindex(columns=dates[-2:])
+
+    # Pairs Mansfield - competitor
+    pairs = pd.DataFrame({'Homologo': comp_df['Homologo'], 'Sku': comp_df['Sku'].map(str).str.strip()})
+    pairs = pairs[pairs['Homologo'] != pairs['Sku']].drop_duplicates()
+
+    # Price index of the two last days (the first column is the previous day when there are two days)
+    index = np.round(prices.reindex(pairs['Homologo']).values / prices.reindex(pairs['Sku']).values * 100, 2)
+    pairs['Price_index'] = index[:, -1]
+    pairs['Previous_index'] = index[:, 0] if len(dates) > 1 else np.nan
+
+    outside = (pairs['Price_index'] < band[0]) | (pairs['Price_index'] > band[1])
+    previous_inside = (pairs['Previous_index'] >= band[0]) & (pairs['Previous_index'] <= band[1])
+    pairs['New_alert'] = outside & (previous_inside | pairs['Previous_index'].isna())
+
+    # Names of the products
+    names = df_last.groupby('SKU_str')[['Producto', 'Fabricante']].last()
+    df_alerts = pairs[outside].copy()
+    df_alerts['Producto_Mansfield'] = names['Producto'].reindex(df_alerts['Homologo']).values
+    df_alerts['Fabricante'] = names['Fabricante'].reindex(df_alerts['Sku']).values
+    df_alerts['Producto'] = names['Producto'].reindex(df_alerts['Sku']).values
+    df_alerts['Fecha'] = dates[-1] if len(dates) else None
+
+    # Farthest from the band first
+    distance = np.maximum(band[0] - df_alerts['Price_index'], df_alerts['Price_index'] - band[1])
+    df_alerts = df_alerts.loc[distance.sort_values(ascending=False, kind='mergesort').index]
+
+    return df_alerts[['Fecha', 'Homologo', 'Producto_Mansfield', 'Sku', 'Fabricante', 'Producto', 'Price_index',
+                      'Previous_index', 'New_alert']]
@@ -0,0 +1,37 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import numpy as np
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Configuration and Global Variables
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Function Definition
+# ----------------------------------------------------------------------------------------------------------------------
+def price_index_table(df_comp, mansfield_prod, price_col='Precio'):
+    """
+    Función que calcula el índice de precio de cada producto en la última fecha disponible.
+    :param df_comp: data frame con el historico de los productos a comparar.
+    :param mansfield_prod: Nombre del producto Mansfield de referencia.
+    :param price_col: Columna de precio a usar, 'Precio' o 'Precio_factor' si se aplicaron multiplicadores.
+    :return: df_info_price: data frame de la última fecha con la columna Price_index.
+    """
+    df_info_price = df_comp[df_comp['Fecha'] == df_comp['Fecha'].max()].copy()
+    mansfield_ref = df_info_price[df_info_price['Producto'] == mansfield_prod][price_col].values
+    df_info_price['Price_index'] = np.round(((mansfield_ref / df_info_price[price_col]) * 100), 2)
+
+    return df_info_price
+
+
+def overall_price_index(df_info_price):
+    """
+    Función que calcula el índice de precio general contra todos los competidores.
+    :param df_info_price: data frame con la columna Price_index (ver price_index_table).
+    :return: overall_price_index: Promedio del índice sin contar el producto Mansfield.
+    """
+    return np.round((df_info_price['Price_index'].abs().sum() - 100) / (len(df_info_price) - 1), 2)
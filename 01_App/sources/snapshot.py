@@ -0,0 +1,267 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import os
+import json
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+from sources.price_alerts import ROLLING_WINDOW, rolling_statistics
+from sources.sql_backend import FILTER_COLUMNS
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Configuration and Global Variables
+# ----------------------------------------------------------------------------------------------------------------------
+# Folder of the snapshots, the dashboard uses the current snapshot instead of the csv files when it is configured
+SNAPSHOT_DIRECTORY = os.environ.get("PRICING_SNAPSHOT", "")
+
+# File with the name of the current version
+CURRENT_FILE = 'CURRENT'
+
+# Columns with an index (rows of each value)
+INDEX_COLUMNS = ['Fecha', 'Market_Place', 'Fabricante', 'SKU_str', 'Producto_sku', 'Tipo']
+
+# Folder of the rolling statistics inside a snapshot, indexed by date
+ROLLING_TABLE = 'rolling'
+ROLLING_INDEX_COLUMNS = ['Fecha']
+
+# Snapshots opened by this process
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Function Definition
+# ----------------------------------------------------------------------------------------------------------------------
+def _write_columns(df, path, index_columns):
+    """
+    Función que guarda cada columna de un data frame como arreglos numpy. Las columnas de texto se guardan como
+    códigos + valores únicos ordenados, y las columnas de index_columns con las filas de cada valor.
+    :return: columns: Diccionario columna -> 'numeric' o 'text'.
+    """
+    os.makedirs(path, exist_ok=True)
+
+    columns = {}
+    for column in df.columns:
+        values = df[column].values
+        if pd.api.types.is_numeric_dtype(df[column]):
+            np.save(os.path.join(path, f'{column}.npy'), values)
+            columns[column] = 'numeric'
+            continue
+
+        # Text columns: codes and sorted unique values (missing values have code -1)
+        codes, categories = pd.factorize(df[column].map(lambda x: x if pd.isna(x) else str(x)), sort=True)
+        np.save(os.path.join(path, f'{column}.codes.npy'), codes.astype(np.int32))
+        np.save(os.path.join(path, f'{column}.values.npy'), np.asarray(categories, dtype=str))
+        columns[column] = 'text'
+
+        if column in index_columns:
+            order = np.argsort(codes, kind='stable').astype(np.int64)
+            offsets = np.searchsorted(codes[order], np.arange(len(categories) + 1))
+            np.save(os.path.join(path, f'{column}.index_rows.npy'), order)
+            np.save(os.path.join(path, f'{column}.index_offsets.npy'), offsets)
+
+    return columns
+
+
+def write_snapshot(df, comp_df, directory, version, keep=2, window=ROLLING_WINDOW):
+    """
+    Función que escribe una versión del historico preparado en arreglos numpy para ser mapeados en memoria por varios
+    procesos, junto con las estadísticas móviles de la página de alertas (ver price_alerts.rolling_statistics). La
+    versión se publica al final cambiando el archivo CURRENT.
+    :param df: data frame con los precios y la historia (ver load_history).
+    :param comp_df: data frame maestro con la relación Homologo - Sku (ver load_master).
+    :param directory: Carpeta de los snapshots.
+    :param version: Versión de los datos (ver figure_cache.data_version).
+    :param keep: Número de versiones a conservar.
+    :param window: Número de registros de la ventana móvil.
+    :return: path: Carpeta del snapshot.
+    """
+    path = os.path.join(directory, version)
+    tmp_path = path + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    meta = {'version': version, 'rows': len(df), 'columns': _write_columns(df, tmp_path, INDEX_COLUMNS),
+            'min_price': float(df['Precio'].min())}
+
+    # Rolling statistics, computed once here instead of in every process of the dashboard
+    df_stats = rolling_statistics(df, window)
+    meta[ROLLING_TABLE] = {'window': window, 'rows': len(df_stats),
+                           'columns': _write_columns(df_stats, os.path.join(tmp_path, ROLLING_TABLE),
+                                                     ROLLING_INDEX_COLUMNS)}
+
+    # Master database, small enough to be read by each process
+    master = pd.DataFrame({'Homologo': comp_df['Homologo'], 'Sku': comp_df['Sku'].map(str).str.strip()})
+    master.to_csv(os.path.join(tmp_path, 'master.csv'), index=False)
+
+    with open(os.path.join(tmp_path, 'meta.json'), 'w') as file:
+        json.dump(meta, file)
+
+    # Publishing the version
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(tmp_path, path)
+    with open(os.path.join(directory, CURRENT_FILE + '.tmp'), 'w') as file:
+        file.write(version)
+    os.replace(os.path.join(directory, CURRENT_FILE + '.tmp'), os.path.join(directory, CURRENT_FILE))
+
+    # Old versions, the processes that still map them keep working until they reopen
+    versions = sorted((entry for entry in os.scandir(directory) if entry.is_dir() and entry.name != version
+                       and not entry.name.endswith('.tmp')), key=lambda entry: entry.stat().st_mtime)
+    for entry in versions[:max(len(versions) - (keep - 1), 0)]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+    return path
+
+
+class PriceSnapshot:
+    """
+    Read-only view of a snapshot written by write_snapshot. Every array is memory-mapped, so the processes that open
+    the same version share the pages of the operating system and only the filtered rows are copied.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as file:
+            self.meta = json.load(file)
+        self.version = self.meta['version']
+        self.rows = self.meta['rows']
+        self.master = pd.read_csv(os.path.join(path, 'master.csv'), dtype=str)
+        self._arrays = {}
+
+    def _array(self, name, table=''):
+        """
+        Función que mapea en memoria un arreglo del snapshot (una sola vez).
+        """
+        name = os.path.join(table, name)
+        if name not in self._arrays:
+            self._arrays[name] = np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r')
+        return self._arrays[name]
+
+    def _column(self, column, rows, table=''):
+        """
+        Función que decodifica las filas indicadas de una columna.
+        """
+        columns = self.meta[table]['columns'] if table else self.meta['columns']
+        if columns[column] == 'numeric':
+            return np.asarray(self._array(column, table)[rows])
+
+        codes = np.asarray(self._array(f'{column}.codes', table)[rows])
+        values = np.asarray(self._array(f'{column}.values', table)[np.maximum(codes, 0)]).astype(object)
+        values[codes < 0] = np.nan
+        return values
+
+    def _rows_of(self, column, values, table=''):
+        """
+        Función que devuelve, ordenadas, las filas donde la columna toma alguno de los valores (usa el índice).
+        """
+        categories = self._array(f'{column}.values', table)
+        rows_index = self._array(f'{column}.index_rows', table)
+        offsets = self._array(f'{column}.index_offsets', table)
+
+        rows = []
+        for value in values:
+            code = np.searchsorted(categories, str(value))
+            if code < len(categories) and categories[code] == str(value):
+                rows.append(rows_index[offsets[code]:offsets[code + 1]])
+
+        return np.sort(np.concatenate(rows)) if rows else np.array([], dtype=np.int64)
+
+    def _frame(self, rows, table=''):
+        """
+        Función que arma el data frame con las filas indicadas.
+        """
+        columns = self.meta[table]['columns'] if table else self.meta['columns']
+        return pd.DataFrame({column: self._column(column, rows, table) for column in columns})
+
+    def _filter_rows(self, skus=None, products=None, **predicates):
+        """
+        Función que devuelve las filas que cumplen con los filtros, None si no hay filtros.
+        """
+        rows = None
+        filters = [(FILTER_COLUMNS[key], [value]) for key, value in predicates.items() if value is not None]
+        filters += [(column, list(values)) for column, values in (('SKU_str', skus), ('Producto_sku', products))
+                    if values is not None]
+        for column, values in filters:
+            column_rows = self._rows_of(column, values)
+            rows = column_rows if rows is None else np.intersect1d(rows, column_rows, assume_unique=True)
+
+        return rows
+
+    def filter_history(self, skus=None, products=None, **predicates):
+        """
+        Función que devuelve el historico que cumple con los filtros, en el orden de los archivos csv.
+        """
+        rows = self._filter_rows(skus=skus, products=products, **predicates)
+        return self._frame(slice(None) if rows is None else rows)
+
+    def distinct_values(self, column, **predicates):
+        """
+        Función que devuelve los valores únicos de una columna en el orden de aparición.
+        """
+        rows = self._filter_rows(**predicates)
+        codes = pd.unique(np.asarray(self._array(f'{column}.codes')[slice(None) if rows is None else rows]))
+        return self._array(f'{column}.values')[codes[codes >= 0]]
+
+    def min_price(self):
+        """
+        Función que devuelve el precio mínimo del historico.
+        """
+        return self.meta['min_price']
+
+    def latest_prices_in_range(self, low, high):
+        """
+        Función que devuelve el último precio de cada producto cuando está en el rango indicado.
+        """
+        dates = self._array('Fecha.values')
+        rows = self._rows_of('Fecha', [dates[-1]])
+        price = self._column('Precio', rows)
+
+        return self._frame(rows[(price >= low) & (price <= high)])
+
+    def compare_products(self, sku_mansfield):
+        """
+        Función que devuelve el historico del producto Mansfield y sus homologos de la competencia.
+        """
+        skus = self.master.loc[self.master['Homologo'] == str(sku_mansfield), 'Sku']
+        return self._frame(self._rows_of('SKU_str', skus))
+
+    def rolling_statistics(self, window=ROLLING_WINDOW, last_dates=None):
+        """
+        Función que devuelve las estadísticas móviles calculadas por write_snapshot, de todas las fechas o solo de las
+        últimas. Devuelve None si el snapshot no las tiene con esa ventana (snapshots anteriores).
+        """
+        meta = self.meta.get(ROLLING_TABLE)
+        if meta is None or meta['window'] != window:
+            return None
+
+        rows = slice(None)
+        if last_dates is not None:
+            dates = self._array('Fecha.values', ROLLING_TABLE)
+            rows = self._rows_of('Fecha', dates[-last_dates:], ROLLING_TABLE)
+
+        return self._frame(rows, ROLLING_TABLE)
+
+
+def open_snapshot(directory=SNAPSHOT_DIRECTORY):
+    """
+    Función que abre la versión actual del snapshot si está configurado (variable PRICING_SNAPSHOT). Cuando el
+    builder publica una nueva versión, el siguiente llamado la abre.
+    :return: snapshot: PriceSnapshot o None.
+    """
+    current = os.path.join(directory, CURRENT_FILE) if directory else ''
+    if not current or not os.path.exists(current):
+        return None
+
+    with open(current) as file:
+        version = file.read().strip()
+
+    with _snapshots_lock:
+        if version not in _snapshots:
+            _snapshots.clear()
+            _snapshots[version] = PriceSnapshot(os.path.join(directory, version))
+        return _snapshots[version]
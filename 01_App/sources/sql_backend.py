@@ -0,0 +1,203 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from sources.figure_cache import data_version
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Configuration and Global Variables
+# ----------------------------------------------------------------------------------------------------------------------
+# Path of the embedded database, the dashboard uses it instead of the csv files when it exists
+SQL_DATABASE = os.environ.get("PRICING_DATABASE", "")
+
+# Columns of the price history that can be used in the filters, mapped to the keyword of filter_history
+FILTER_COLUMNS = {'market_place': 'Market_Place', 'brand': 'Fabricante', 'sku': 'SKU_str', 'tipo': 'Tipo'}
+
+# Databases opened by this process, by path
+_databases = {}
+_databases_lock = threading.Lock()
+
+# Indexes of the price history table
+INDEXES = {'idx_history_fecha': 'Fecha', 'idx_history_sku': 'SKU_str', 'idx_history_brand': 'Fabricante',
+           'idx_history_market': 'Market_Place'}
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Function Definition
+# ----------------------------------------------------------------------------------------------------------------------
+class PriceDatabase:
+    """
+    Embedded analytical database (DuckDB if installed, SQLite otherwise) with the price history and the master
+    database. The filters are pushed down as indexed SQL queries, so the history can stay on disk.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.version = data_version([path])
+        self.engine = 'duckdb' if duckdb is not None and not path.endswith(('.sqlite', '.db')) else 'sqlite'
+        if self.engine == 'duckdb':
+            self._con = duckdb.connect(path, read_only=True)
+        else:
+            self._con = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def query(self, sql, params=()):
+        """
+        Función que ejecuta una consulta y devuelve el resultado como dataframe.
+        """
+        with self._lock:
+            if self._con is None:
+                df = None
+            elif self.engine == 'duckdb':
+                df = self._con.execute(sql, list(params)).df()
+            else:
+                df = pd.read_sql_query(sql, self._con, params=list(params))
+
+        # Closed because a new version was published, the reruns still holding this object read the new one
+        if df is None:
+            return open_database(self.path).query(sql, params)
+
+        # NULL text as NaN, like the csv files (url_image_capture checks math.isnan)
+        for column in df.columns[df.dtypes == object]:
+            df[column] = df[column].where(df[column].notna(), np.nan)
+
+        return df
+
+    def close(self):
+        """
+        Función que cierra la conexión (duckdb comparte una sola instancia por ruta en el proceso, la nueva versión del
+        archivo solo se lee después de cerrar la anterior).
+        """
+        with self._lock:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+    def _where(self, skus=None, products=None, **predicates):
+        """
+        Función que construye la clausula WHERE con los filtros no nulos.
+        """
+        clauses, params = [], []
+        for key, value in predicates.items():
+            if value is not None:
+                clauses.append(f'"{FILTER_COLUMNS[key]}" = ?')
+                params.append(str(value))
+        for column, values in (('SKU_str', skus), ('Producto_sku', products)):
+            if values is not None:
+                values = [str(value) for value in values]
+                clauses.append(f'"{column}" IN ({", ".join("?" * len(values)) or "NULL"})')
+                params.extend(values)
+
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def filter_history(self, skus=None, products=None, **predicates):
+        """
+        Función que devuelve el historico que cumple con los filtros, en el orden de los archivos csv.
+        """
+        where, params = self._where(skus=skus, products=products, **predicates)
+        df = self.query(f'SELECT * FROM price_history{where} ORDER BY row_order', params)
+        return df.drop(columns='row_order')
+
+    def distinct_values(self, column, **predicates):
+        """
+        Función que devuelve los valores únicos de una columna en el orden de aparición.
+        """
+        where, params = self._where(**predicates)
+        df = self.query(f'SELECT "{column}", MIN(row_order) AS first_row FROM price_history{where} '
+                        f'GROUP BY "{column}" ORDER BY first_row', params)
+        return df[column].values
+
+    def min_price(self):
+        """
+        Función que devuelve el precio mínimo del historico.
+        """
+        return self.query('SELECT MIN("Precio") AS min_price FROM price_history')['min_price'].iloc[0]
+
+    def latest_prices_in_range(self, low, high):
+        """
+        Función que devuelve el último precio de cada producto cuando está en el rango indicado.
+        """
+        df = self.query('SELECT * FROM price_history WHERE "Fecha" = (SELECT MAX("Fecha") FROM price_history) '
+                        'AND "Precio" BETWEEN ? AND ? ORDER BY row_order', (low, high))
+        return df.drop(columns='row_order')
+
+    def compare_products(self, sku_mansfield):
+        """
+        Función que devuelve el historico del producto Mansfield y sus homologos de la competencia.
+        """
+        df = self.query('SELECT h.* FROM price_history h JOIN master m ON h."SKU_str" = m."Sku" '
+                        'WHERE m."Homologo" = ? ORDER BY h.row_order', (str(sku_mansfield),))
+        return df.drop(columns='row_order')
+
+
+def build_database(df, comp_df, path):
+    """
+    Función que crea la base de datos embebida con el historico de precios y la base maestra, con índices por fecha,
+    SKU, marca y marketplace. La base se crea en un archivo temporal que reemplaza la anterior al final, así los
+    procesos del dashboard nunca abren una base a medio construir.
+    :param df: data frame con los precios y la historia (ver load_history).
+    :param comp_df: data frame maestro con la relación Homologo - Sku (ver load_master).
+    :param path: Ruta de la base de datos, extensión .sqlite o .db para usar SQLite.
+    """
+    tmp_path = path + '.tmp'
+    for file in (tmp_path, tmp_path + '.wal'):
+        if os.path.exists(file):
+            os.remove(file)
+
+    # Stored as text to avoid mixed types between files, row_order keeps the order of the csv files
+    df = df.copy()
+    df['SKU'] = df['SKU'].map(str)
+    df.insert(0, 'row_order', range(len(df)))
+    master = pd.DataFrame({'Homologo': comp_df['Homologo'], 'Sku': comp_df['Sku'].map(str).str.strip()})
+
+    if duckdb is not None and not path.endswith(('.sqlite', '.db')):
+        con = duckdb.connect(tmp_path)
+        con.register('df_history', df)
+        con.register('df_master', master)
+        con.execute('CREATE TABLE price_history AS SELECT * FROM df_history')
+        con.execute('CREATE TABLE master AS SELECT * FROM df_master')
+    else:
+        con = sqlite3.connect(tmp_path)
+        df.to_sql('price_history', con, index=False)
+        master.to_sql('master', con, index=False)
+
+    for name, column in INDEXES.items():
+        con.execute(f'CREATE INDEX {name} ON price_history ("{column}")')
+    con.execute('CREATE INDEX idx_master_homologo ON master ("Homologo")')
+    con.commit()
+    con.close()
+
+    # Publishing the new version, the connections already open keep reading the old file
+    os.replace(tmp_path, path)
+
+
+def open_database(path=SQL_DATABASE):
+    """
+    Función que abre la base de datos embebida si está configurada (variable PRICING_DATABASE) y existe. Cuando
+    build_database publica una nueva versión del archivo, el siguiente llamado la abre.
+    :return: db: PriceDatabase o None para usar el historico en memoria.
+    """
+    if not path or not os.path.exists(path):
+        return None
+
+    # One connection per process and version of the file, shared by every session
+    version = data_version([path])
+    with _databases_lock:
+        db = _databases.get(path)
+        if db is None or db.version != version:
+            if db is not None:
+                db.close()
+            _databases[path] = db = PriceDatabase(path)
+        return db
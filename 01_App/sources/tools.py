@@ -7,9 +7,13 @@ import math
 import numpy as np
 import urllib.request
 import streamlit as st
+import streamlit.components.v1 as components
 
 from PIL import Image
 
+from sources.chart_encoding import CHART_ENCODING, figure_html
+from sources.export import EXPORT_FORMATS, iter_export
+
 # ----------------------------------------------------------------------------------------------------------------------
 # Configuration and Global Variables
 # ----------------------------------------------------------------------------------------------------------------------
@@ -157,3 +161,47 @@ def visual_info_multiplier(df_comp):
             df_comp.loc[df_comp['Producto_sku'] == df_comp_aux['Producto_sku'].unique()[2], 'Precio_factor'] \
                 *= ((multi_factor/100) + 1)
     return df_comp
+
+
+def multiplier_vector(df_comp):
+    """
+    Function that returns the multiplier factor applied to each product of the comparison as a sorted tuple, used as
+    part of the figure cache key.
+    """
+    df_last = df_comp.groupby('Producto_sku').last()
+    factors = np.round(df_last['Precio_factor'] / df_last['Precio'], 4)
+
+    return tuple(factors.items())
+
+
+def export_table(df, key, file_name):
+    """
+    Function for exporting a table in CSV, Excel or Parquet. The file is built block by block with the generators of
+    sources.export when the user ask for it, not on every rerun.
+    """
+    e1, e2, _ = st.columns((1, 1, 4))
+    export_format = e1.selectbox('Export format', list(EXPORT_FORMATS), key=f'{key}_export_format')
+    extension, mime = EXPORT_FORMATS[export_format]
+
+    if e2.button('Prepare export', key=f'{key}_export'):
+        # The download button of streamlit needs the whole file
+        data = b''.join(iter_export(df, export_format))
+        e2.download_button(f'Download {extension}', data=data, file_name=f'{file_name}.{extension}', mime=mime,
+                           key=f'{key}_download')
+
+
+def show_figure(fig, payload, container=None):
+    """
+    Function for showing a plotly figure. With PRICING_CHART_ENCODING=binary the dates and prices are sent as typed
+    arrays and drawn with plotly.js in a component, otherwise st.plotly_chart sends the figure as json (old front ends).
+    The payload comes from the figure cache (see FigureCache.get_or_build), so nothing is serialized again here.
+    Returns the payload size report of the figure.
+    """
+    if CHART_ENCODING != 'binary':
+        (container or st).plotly_chart(fig, use_container_width=True)
+    else:
+        height = fig.layout.height or 450
+        with container or st.container():
+            components.html(figure_html(payload['encoded_json'], height), height=height + 10)
+
+    return payload['report']
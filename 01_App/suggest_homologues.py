@@ -0,0 +1,79 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Proposes the Mansfield homologue of the scraped competitor products that are not in the master database.
+# Usage (from the 01_App folder):
+#   python suggest_homologues.py --output homologue_suggestions.xlsx
+#   python suggest_homologues.py --apply homologue_suggestions.xlsx --output "Productos Mansfield (new).xlsx"
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import time
+import argparse
+
+import pandas as pd
+
+from sources.data_loader import DATA_DIRECTORY, MASTER_FILE, list_data_files, load_history, load_master
+from sources.homologue_matcher import MATCH_NEIGHBORS, MATCH_SUGGESTIONS, MIN_SIMILARITY, evaluate_matcher, \
+    mansfield_catalog, merge_approved, suggest_homologues, unmapped_products
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Function Definition
+# ----------------------------------------------------------------------------------------------------------------------
+def read_table(filename):
+    """
+    Función que lee un archivo csv o excel.
+    """
+    dtype = {'Sku': str, 'Homologo Mansfield': str, 'Approved': str}
+    return pd.read_csv(filename, dtype=dtype) if filename.endswith('.csv') else pd.read_excel(filename, dtype=dtype)
+
+
+def write_table(df, filename):
+    """
+    Función que escribe un archivo csv o excel según la extensión.
+    """
+    if filename.endswith('.csv'):
+        df.to_csv(filename, index=False)
+    else:
+        df.to_excel(filename, index=False)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Main
+# ----------------------------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Homologue suggestions for the unmapped competitor products.")
+    parser.add_argument('--output', default='homologue_suggestions.xlsx',
+                        help="Suggestions file (.xlsx or .csv), or the new master database with --apply.")
+    parser.add_argument('--data-dir', default=DATA_DIRECTORY, help="Folder with the csv files of the robot.")
+    parser.add_argument('--master', default=MASTER_FILE, help="Excel file with the master database.")
+    parser.add_argument('--neighbors', type=int, default=MATCH_NEIGHBORS, help="Candidates looked up by product.")
+    parser.add_argument('--suggestions', type=int, default=MATCH_SUGGESTIONS, help="Suggestions kept by product.")
+    parser.add_argument('--min-similarity', type=float, default=MIN_SIMILARITY, help="Minimum cosine similarity.")
+    parser.add_argument('--evaluate', action='store_true',
+                        help="Measure the matcher with the products already mapped in the master database.")
+    parser.add_argument('--apply', default=None,
+                        help="Reviewed suggestions file, the rows with Approved = Si are added to the master database.")
+    args = parser.parse_args()
+
+    start = time.time()
+
+    if args.apply:
+        df_master = pd.read_excel(args.master, dtype={'Sku': str})
+        df_new_master = merge_approved(df_master, read_table(args.apply))
+        write_table(df_new_master, args.output)
+        print(f"{len(df_new_master) - len(df_master)} homologues added -> {args.output}")
+    else:
+        df = load_history(list_data_files(args.data_dir))
+        comp_df = load_master(args.master)
+        match_args = dict(neighbors=args.neighbors, suggestions=args.suggestions, min_similarity=args.min_similarity)
+
+        if args.evaluate:
+            print(evaluate_matcher(df, comp_df, **match_args))
+        else:
+            df_products = unmapped_products(df, comp_df)
+            df_suggestions = suggest_homologues(df_products, mansfield_catalog(df, comp_df), **match_args)
+            write_table(df_suggestions, args.output)
+            print(f"{len(df_products)} unmapped products, {df_suggestions['Sku'].nunique()} with suggestions in "
+                  f"{time.time() - start:.1f} s -> {args.output}")
@@ -0,0 +1,131 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import numpy as np
+import pandas as pd
+import pytest
+
+from sources.data_filters import compare_products, distinct_values, filter_history, filter_price_range, min_price
+from sources.data_loader import load_history
+from sources.price_alerts import last_dates_of, rolling_stage, rolling_statistics
+from sources.snapshot import PriceSnapshot, write_snapshot
+from sources.sql_backend import PriceDatabase, build_database, duckdb
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Configuration and Global Variables
+# ----------------------------------------------------------------------------------------------------------------------
+BACKENDS = ['sqlite', pytest.param('duckdb', marks=pytest.mark.skipif(duckdb is None, reason="duckdb not installed")),
+            'snapshot']
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Fixtures
+# ----------------------------------------------------------------------------------------------------------------------
+@pytest.fixture(scope='module')
+def history(tmp_path_factory):
+    """
+    Historico pequeño en dos archivos mensuales, leídos con el más reciente primero: SKU numéricos y de texto, y
+    productos sin imagen.
+    """
+    products = [('Mansfield', 'Mansfield Alto 130 Std RF Bowl', 130010007, 'Bowl', 'build.com'),
+                ('Gerber', 'Gerber Maxwell Std RF Bowl', 'GMX21952', 'Bowl', 'build.com'),
+                ('American Standard', 'American Std Cadet 3 1,6 gpf Tank', '4021.001N', 'Tank', 'homedepot'),
+                ('Mansfield', 'Mansfield Summit 1,6 gpf Tank', 386010000, 'Tank', 'homedepot')]
+    rows = []
+    for day, date in enumerate(pd.date_range('2022-01-25', periods=10).strftime('%Y-%m-%d')):
+        for number, (brand, name, sku, tipo, market) in enumerate(products):
+            rows.append({'Fecha': date, 'Market_Place': market, 'Fabricante': brand, 'Producto': name, 'SKU': sku,
+                         'Precio': 100.0 + 40 * number + 3 * day, 'Moneda': 'USD',
+                         'Image_url': np.nan if number == 1 else f'https://images/{sku}.png',
+                         'URL': f'https://{market}/{sku}', 'Tipo': tipo, 'Linea': name.split()[1]})
+    df = pd.DataFrame(rows)
+
+    folder = tmp_path_factory.mktemp('data')
+    df[df['Fecha'] < '2022-02-01'].to_csv(folder / 'm0.csv', index=False)
+    df[df['Fecha'] >= '2022-02-01'].to_csv(folder / 'm1.csv', index=False)
+
+    return load_history([str(folder / 'm1.csv'), str(folder / 'm0.csv')])
+
+
+@pytest.fixture(scope='module')
+def comp_df():
+    """
+    Base maestra con un producto Mansfield y sus dos homologos.
+    """
+    return pd.DataFrame({'Homologo': ['130010007', '130010007', '130010007'],
+                         'Sku': [130010007, 'GMX21952', ' 4021.001N ']})
+
+
+@pytest.fixture(scope='module', params=BACKENDS)
+def source(request, history, comp_df, tmp_path_factory):
+    """
+    Fuente de datos alternativa al data frame en memoria.
+    """
+    if request.param == 'snapshot':
+        return PriceSnapshot(write_snapshot(history, comp_df, str(tmp_path_factory.mktemp('snapshots')), 'v1'))
+
+    path = str(tmp_path_factory.mktemp('db') / f'pricing.{request.param}')
+    build_database(history, comp_df, path)
+
+    return PriceDatabase(path)
+
+
+def assert_same_frame(df_source, df_memory):
+    """
+    Compara el resultado de una fuente con el del data frame en memoria. Las fuentes guardan el SKU como texto.
+    """
+    df_memory = df_memory.assign(SKU=df_memory['SKU'].map(str))
+    pd.testing.assert_frame_equal(df_source.reset_index(drop=True), df_memory.reset_index(drop=True),
+                                  check_dtype=False)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------------------------------------------------
+@pytest.mark.parametrize('predicates', [{}, {'brand': 'Mansfield'}, {'market_place': 'homedepot'},
+                                        {'sku': 130010007}, {'sku': '130010007'}, {'sku': '4021.001N'},
+                                        {'brand': 'Gerber', 'tipo': 'Bowl'}, {'brand': 'Unknown'}])
+def test_filter_history(source, history, predicates):
+    assert_same_frame(filter_history(source, **predicates), filter_history(history, **predicates))
+
+
+def test_filter_history_skus_products(source, history):
+    skus = [130010007, 'GMX21952']
+    products = ['Gerber Maxwell Std RF Bowl_GMX21952']
+    assert_same_frame(filter_history(source, skus=skus), filter_history(history, skus=skus))
+    assert_same_frame(filter_history(source, products=products), filter_history(history, products=products))
+
+
+@pytest.mark.parametrize('low, high', [(100.0, 200.0), (150.0, 260.0), (900.0, 1000.0)])
+def test_filter_price_range(source, history, low, high):
+    assert_same_frame(filter_price_range(source, low, high), filter_price_range(history, low, high))
+
+
+def test_compare_products(source, history, comp_df):
+    df_memory = compare_products(history, comp_df, 130010007)
+    assert_same_frame(compare_products(source, comp_df, 130010007), df_memory)
+    assert df_memory['SKU_str'].nunique() == 3
+
+
+@pytest.mark.parametrize('column, predicates', [('Fabricante', {}), ('Market_Place', {}),
+                                                ('Producto_sku', {'brand': 'Mansfield'})])
+def test_distinct_values(source, history, column, predicates):
+    assert list(distinct_values(source, column, **predicates)) == list(distinct_values(history, column, **predicates))
+
+
+def test_min_price(source, history):
+    assert min_price(source) == min_price(history)
+
+
+def test_missing_text_is_nan(source, history):
+    # url_image_capture relies on math.isnan for the products without image
+    df_source = filter_history(source, sku='GMX21952')
+    assert all(isinstance(url, float) and np.isnan(url) for url in df_source['Image_url'])
+
+
+@pytest.mark.parametrize('last_dates', [None, 1, 2])
+def test_rolling_stage(source, history, last_dates):
+    df_stats = rolling_stage(source, source.version, last_dates=last_dates)
+    pd.testing.assert_frame_equal(df_stats, last_dates_of(rolling_statistics(history), last_dates), check_dtype=False)
@@ -0,0 +1,45 @@
+# Python project Dashboard for pricing
+# Creado por: Juan Monsalvo
+# ----------------------------------------------------------------------------------------------------------------------
+# Libraries import
+# ----------------------------------------------------------------------------------------------------------------------
+import numpy as np
+import pandas as pd
+import pytest
+
+from sources.export import export_to_file
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------------------------------------------------
+def test_parquet_mixed_sku_several_chunks(tmp_path):
+    # Numeric and text SKUs as in the robot files, and a text column without values in the first chunk
+    df = pd.DataFrame({'Fecha': ['2022-01-01'] * 6,
+                       'SKU': [135010007, '4021.101N.020', 135010007, 'GMX20912', 4142100, '4021.101N.020'],
+                       'Precio': [277.29, 310.5, 280.0, np.nan, 150.0, 305.0],
+                       'Image_url': [None, None, None, 'https://images/a.png', np.nan, 'https://images/b.png']})
+
+    path = export_to_file(df, tmp_path / 'history.parquet', 'Parquet', chunk_rows=2)
+    df_read = pq.read_table(path).to_pandas()
+
+    assert pq.ParquetFile(path).num_row_groups == 3
+    assert list(df_read['SKU']) == [str(sku) for sku in df['SKU']]
+    assert df_read['Image_url'].isna().tolist() == [True, True, True, False, True, False]
+    assert np.allclose(df_read['Precio'], df['Precio'], equal_nan=True)
+
+
+@pytest.mark.parametrize('export_format', ['CSV', 'Excel', 'Parquet'])
+def test_empty_frame(tmp_path, export_format):
+    # Price alerts without any pair outside the band
+    df = pd.DataFrame({'Fecha': pd.Series(dtype=object), 'SKU': pd.Series(dtype=object),
+                       'Price_index': pd.Series(dtype=float)})
+
+    path = export_to_file(df, tmp_path / 'alerts', export_format)
+    readers = {'CSV': pd.read_csv, 'Excel': pd.read_excel, 'Parquet': pd.read_parquet}
+    df_read = readers[export_format](path)
+
+    assert list(df_read.columns) == list(df.columns)
+    assert len(df_read) == 0